@@ -1,13 +1,26 @@
 """AI summarizer: batch-summarize articles with tags using SiliconFlow API."""
 
+import asyncio
 import hashlib
 import json
 import logging
+import time
 from datetime import date, datetime, timezone, timedelta
 
-from openai import OpenAI
-
-from pipeline.config import SILICONFLOW_API_KEY, SILICONFLOW_MODEL, AI_BATCH_SIZE
+from openai import AsyncOpenAI, BadRequestError
+
+from pipeline.config import (
+    SILICONFLOW_API_KEY, SILICONFLOW_MODEL, SILICONFLOW_BASE_URL, AI_BATCH_SIZE,
+    AI_BATCH_INPUT_TOKENS, AI_SUMMARY_OUTPUT_TOKENS, AI_MAX_CONCURRENT_BATCHES, AI_REQUEST_TIMEOUT,
+    AI_TOKENS_PER_MINUTE, AI_PROMPT_TAG_REFRESH, DEDUP_ENABLED,
+)
+from pipeline.dedup import Deduper, dedupe_posts
+from pipeline.html_text import post_text
+from pipeline.metrics import get_run_metrics
+from pipeline.rate_limit import TokenRateLimiter, estimate_tokens
+from pipeline.seen_entries import get_seen_index, guid_key
+from pipeline.summary_cache import get_summary_cache, make_key
+from pipeline.tag_vocabulary import get_tag_vocabulary
 
 logger = logging.getLogger(__name__)
 
@@ -23,22 +36,28 @@ DEFAULT_SUBTAGS = [
 ]
 
 
-def _load_existing_tags() -> list[str]:
-    """Load all unique tags from the latest articles JSON to guide tag reuse."""
-    try:
-        from pathlib import Path
-        latest = Path("site/content/articles/latest.json")
-        if not latest.exists():
-            return DEFAULT_SUBTAGS
-        data = json.loads(latest.read_text())
-        tags = set()
-        for article in data.get("articles", []):
-            for tag in article.get("tags", []):
-                if "/" in tag:  # only subtags
-                    tags.add(tag)
-        return sorted(tags) if tags else DEFAULT_SUBTAGS
-    except Exception:
-        return DEFAULT_SUBTAGS
+def _existing_tags() -> list[str]:
+    """Most used subtags from the run-wide vocabulary, to guide tag reuse.
+
+    The list only changes once AI_PROMPT_TAG_REFRESH new subtags have reached
+    the top, so consecutive requests share one cacheable system prompt.
+    """
+    global _prompt_tags
+    tags = get_tag_vocabulary().top() or DEFAULT_SUBTAGS
+    if _prompt_tags is None or len(set(tags) - set(_prompt_tags)) >= AI_PROMPT_TAG_REFRESH:
+        _prompt_tags = tags
+    return _prompt_tags
+
+
+def _record_tags(batch: list[dict], summaries: dict):
+    """Feed a batch's fresh tags into the vocabulary so later batches can reuse them."""
+    vocab = get_tag_vocabulary()
+    for j, post in enumerate(batch):
+        summary_data = summaries.get(j + 1)
+        if summary_data:
+            tags = [t for t in summary_data.get("tags", []) if _validate_tag(t)]
+            vocab.add(tags, _make_article_id(post["url"]))
+
 
 VALID_TOP_TAGS = [
     "AI", "programming", "web", "security", "devops", "cloud",
@@ -47,7 +66,10 @@ VALID_TOP_TAGS = [
     "tools", "culture",
 ]
 
-BATCH_PROMPT_TEMPLATE = """请为以下 {count} 篇技术文章生成中文摘要和标签。
+# The system prompt is identical across batches and users, so providers can
+# serve it from their prefix cache; per-user instructions and articles follow
+# in the user message.
+BATCH_SYSTEM_PROMPT = """你的任务是为技术文章生成中文摘要和标签。
 
 要求：
 - summary_zh: 2-3句中文摘要，概括文章核心内容
@@ -64,20 +86,38 @@ BATCH_PROMPT_TEMPLATE = """请为以下 {count} 篇技术文章生成中文摘
 - 不要生造不合理的层级，宁可停在第2层
 - 优先从上面的已有子标签中选择，保持标签一致性
 
-文章列表：
-{articles}
-
 请以JSON格式回复，不要包含其他内容：
 {{"articles": [{{"index": 1, "summary_zh": "...", "tags": ["AI", "AI/LLM/Agent"]}}]}}"""
 
+BATCH_USER_TEMPLATE = """请为以下 {count} 篇技术文章生成中文摘要和标签。
+
+文章列表：
+{articles}"""
+
 
-def _get_client() -> OpenAI:
+BATCH_MAX_TOKENS = 4000
+BATCH_MAX_SPLITS = 3  # Times a failed batch's missing articles are re-asked in smaller batches
+# Bump when the batch prompts or their inputs change, to invalidate cached summaries
+BATCH_PROMPT_VERSION = "2"
+
+_async_client: AsyncOpenAI | None = None
+_prompt_tags: list[str] | None = None
+_rate_limiter: TokenRateLimiter | None = None
+_batch_semaphore: asyncio.Semaphore | None = None
+
+
+def _get_async_client() -> AsyncOpenAI:
+    """Return the run-wide AsyncOpenAI client, so all callers share one connection pool."""
+    global _async_client
     if not SILICONFLOW_API_KEY:
         raise RuntimeError("SILICONFLOW_API_KEY not configured")
-    return OpenAI(
-        api_key=SILICONFLOW_API_KEY,
-        base_url="https://api.siliconflow.cn/v1",
-    )
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=SILICONFLOW_API_KEY,
+            base_url=SILICONFLOW_BASE_URL,
+            timeout=AI_REQUEST_TIMEOUT,
+        )
+    return _async_client
 
 
 def _validate_tag(tag: str) -> bool:
@@ -91,21 +131,89 @@ def _make_article_id(url: str) -> str:
     return hashlib.sha256(url.encode()).hexdigest()[:16]
 
 
-def _filter_recent_posts(posts: list[dict], hours: int = 48) -> list[dict]:
-    """Filter posts to only those published within the last N hours."""
+def summary_cache_key(post: dict, custom_prompt: str | None = None) -> str:
+    """Summary cache key for a post's short summary under a given custom prompt."""
+    return make_key(
+        "short", _make_article_id(post["url"]),
+        f"{post['title']}\n{post.get('content') or ''}",
+        SILICONFLOW_MODEL, BATCH_PROMPT_VERSION, custom_prompt or "",
+    )
+
+
+def _filter_recent_posts(posts: list[dict], hours: int = 48, sightings: dict | None = None) -> list[dict]:
+    """Filter posts to only those published (or, if undated, first seen) within the last N hours."""
     cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
     cutoff_iso = cutoff.isoformat()
     recent = []
     for p in posts:
-        pub = p.get("published_at", "")
+        pub = _post_date(p, sightings or {})
         if pub and pub >= cutoff_iso:
             recent.append(p)
     return recent
 
 
-def summarize_articles(posts: list[dict]) -> dict:
+def _post_date(post: dict, sightings: dict) -> str:
+    """published_at, or when the seen index first saw the entry if the feed gives no date."""
+    return post.get("published_at") or sightings.get(_make_article_id(post["url"]), {}).get("first_seen", "")
+
+
+def _observe(posts: list[dict]) -> dict[str, dict]:
+    """Record posts in the seen-entry index. Returns sightings by article id ({} if disabled)."""
+    seen = get_seen_index()
+    if seen is None or not posts:
+        return {}
+    return seen.observe([(_make_article_id(p["url"]), guid_key(p)) for p in posts])
+
+
+def _summary_version() -> str:
+    return f"{SILICONFLOW_MODEL}:{BATCH_PROMPT_VERSION}"
+
+
+def _carry_forward(misses: list[tuple[str, dict]], sightings: dict, cache, known: dict) -> list[tuple[str, dict]]:
+    """Reuse the previous summary of already-seen entries whose text changed since.
+
+    Returns the misses that still need summarizing.
+    """
+    previous = {}
+    for key, post in misses:
+        sighting = sightings.get(_make_article_id(post["url"]))
+        if (
+            sighting and not sighting["new"] and sighting["summary_key"]
+            and sighting["summary_version"] == _summary_version()
+        ):
+            previous[key] = sighting["summary_key"]
+    if not previous or cache is None:
+        return misses
+
+    found = cache.get_many(list(previous.values()))
+    remaining, carried = [], []
+    for key, post in misses:
+        value = found.get(previous.get(key))
+        if value:
+            known[key] = value
+            carried.append((key, _make_article_id(post["url"]), value))
+        else:
+            remaining.append((key, post))
+    cache.put_many(carried)
+    return remaining
+
+
+def _remember_summaries(selected: list[tuple[str, dict]], known: dict):
+    """Point each selected entry's seen-index record at its current summary."""
+    seen = get_seen_index()
+    if seen is not None:
+        seen.set_summaries(
+            [(_make_article_id(p["url"]), k) for k, p in selected if k in known],
+            _summary_version(),
+        )
+
+
+async def summarize_articles(posts: list[dict]) -> dict:
     """Filter recent posts, batch-summarize with AI, return articles data.
 
+    Batches run concurrently (up to AI_MAX_CONCURRENT_BATCHES in flight,
+    throttled by AI_TOKENS_PER_MINUTE) and are merged back in original order.
+
     Args:
         posts: List of post dicts from feed_fetcher.
 
@@ -123,50 +231,49 @@ def summarize_articles(posts: list[dict]) -> dict:
             "articles": [],
         }
 
-    # Filter to recent posts (last 48h)
-    recent = _filter_recent_posts(posts, hours=48)
+    # Filter to recent posts (last 48h; undated posts by when they were first seen)
+    sightings = _observe(posts)
+    recent = _filter_recent_posts(posts, hours=48, sightings=sightings)
     if not recent:
-        recent = sorted(posts, key=lambda p: p.get("published_at", ""), reverse=True)[:50]
-    recent = sorted(recent, key=lambda p: p.get("published_at", ""), reverse=True)
+        recent = sorted(posts, key=lambda p: _post_date(p, sightings), reverse=True)[:50]
+    recent = sorted(recent, key=lambda p: _post_date(p, sightings), reverse=True)
+
+    # Collapse reposts and mirrors; the earliest copy represents each cluster
+    alternates = {}
+    if DEDUP_ENABLED:
+        kept, deduper = dedupe_posts(recent[::-1], date_of=lambda p: _post_date(p, sightings))
+        recent = kept[::-1]
+        alternates = deduper.alternates
+        logger.info(f"Dedup: {deduper.duplicates} duplicates folded into {len(alternates)} articles")
     logger.info(f"Summarizing {len(recent)} recent articles (from {len(posts)} total)")
 
-    client = _get_client()
+    # Only cache misses that aren't already-seen entries go to the API
+    cache = get_summary_cache()
+    keys = [summary_cache_key(p) for p in recent]
+    known = cache.get_many(keys) if cache else {}
+    misses = [(k, p) for k, p in zip(keys, recent) if k not in known]
+    cached = len(recent) - len(misses)
+    remaining = _carry_forward(misses, sightings, cache, known)
+    logger.info(
+        f"{cached} summaries cached, {len(misses) - len(remaining)} carried forward, "
+        f"{len(remaining)} to generate"
+    )
+    misses = remaining
+
     total_tokens = 0
-    articles = []
-
-    # Process in batches
-    for i in range(0, len(recent), AI_BATCH_SIZE):
-        batch = recent[i:i + AI_BATCH_SIZE]
-        batch_num = i // AI_BATCH_SIZE + 1
-        total_batches = (len(recent) + AI_BATCH_SIZE - 1) // AI_BATCH_SIZE
-        logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch)} articles)")
-        summaries, tokens = _batch_summarize(client, batch)
-        total_tokens += tokens
-
-        for j, post in enumerate(batch):
-            idx = j + 1
-            summary_data = summaries.get(idx, None)
-            if summary_data:
-                summary_zh = summary_data.get("summary_zh", post["title"])
-                tags = [t for t in summary_data.get("tags", []) if _validate_tag(t)]
-            else:
-                # Fallback: use title as summary, category as tag
-                summary_zh = post["title"]
-                cat = post.get("category", "")
-                tags = _category_to_tags(cat)
-
-            articles.append({
-                "id": _make_article_id(post["url"]),
-                "title": post["title"],
-                "url": post["url"],
-                "author": post.get("author", ""),
-                "feed_title": post.get("feed_title", ""),
-                "category": post.get("category", ""),
-                "published_at": post.get("published_at", ""),
-                "content": post.get("content", ""),
-                "summary_zh": summary_zh,
-                "tags": tags if tags else ["tools"],
-            })
+    if misses:
+        client = _get_async_client()
+        batches = pack_batches(misses)
+        # Each batch is cached as soon as it finishes, so an interrupted run keeps it
+        results = await summarize_batches(
+            client,
+            [[p for _, p in b] for b in batches],
+            on_result=lambda i, result: _store_summaries(batches[i], result[0], known, cache),
+        )
+        total_tokens = sum(tokens for _, tokens in results)
+
+    _remember_summaries(list(zip(keys, recent)), known)
+    articles = [_build_article(p, known.get(k), alternates) for k, p in zip(keys, recent)]
 
     logger.info(f"Summarized {len(articles)} articles, {total_tokens} tokens used")
     return {
@@ -178,6 +285,205 @@ def summarize_articles(posts: list[dict]) -> dict:
     }
 
 
+async def summarize_stream(queue: asyncio.Queue, on_batch=None) -> dict:
+    """Streaming variant of summarize_articles fed by fetch_all_feeds(on_posts=...).
+
+    Consumes lists of posts from `queue` until a None sentinel. Recent posts are
+    packed into batches that start as soon as they fill, while slower feeds are
+    still downloading. `on_batch(articles)` is called as each batch finishes.
+    Returns the same articles as summarize_articles would for all posts
+    (posts published at the same instant may be ordered differently). When an
+    earlier copy of a story arrives after its repost was selected, the earlier
+    copy replaces it and is summarized too.
+    """
+    today = date.today().isoformat()
+    cache = get_summary_cache()
+    known: dict[str, dict] = {}
+    all_posts: list[dict] = []
+    sightings: dict[str, dict] = {}
+    deduper = Deduper(date_of=lambda p: _post_date(p, sightings)) if DEDUP_ENABLED else None
+    selected: list[tuple[str, dict]] = []  # (cache key, post) in arrival order
+    pending: list[tuple[str, dict]] = []
+    tasks: list[asyncio.Task] = []
+
+    async def run_batch(batch: list[tuple[str, dict]]) -> int:
+        client = _get_async_client()
+        [(summaries, tokens)] = await summarize_batches(client, [[p for _, p in batch]])
+        _store_summaries(batch, summaries, known, cache)
+        if on_batch:
+            on_batch([_build_article(p, known.get(k)) for k, p in batch])
+        return tokens
+
+    def select(posts: list[dict]):
+        if deduper:
+            kept = []
+            for post in posts:
+                duplicate = deduper.add(post)
+                if duplicate is post:
+                    continue
+                kept.append(post)
+                if duplicate is not None:
+                    # An earlier copy took over; drop the replaced one unless already sent
+                    pending[:] = [(k, p) for k, p in pending if p is not duplicate]
+            posts = kept
+        keys = [summary_cache_key(p) for p in posts]
+        if cache:
+            known.update(cache.get_many(keys))
+        selected.extend(zip(keys, posts))
+        misses = [(k, p) for k, p in zip(keys, posts) if k not in known]
+        pending.extend(_carry_forward(misses, sightings, cache, known))
+        # Start every batch that is full; the remainder waits for more posts
+        while pending:
+            n = _next_batch_size(pending)
+            if n == len(pending) and n < _batch_limit():
+                break
+            tasks.append(asyncio.create_task(run_batch(pending[:n])))
+            del pending[:n]
+
+    while (posts := await queue.get()) is not None:
+        all_posts.extend(posts)
+        sightings.update(_observe(posts))
+        select(_filter_recent_posts(posts, hours=48, sightings=sightings))
+
+    # Same fallback as summarize_articles when nothing is recent
+    if not selected and all_posts:
+        select(sorted(all_posts, key=lambda p: _post_date(p, sightings), reverse=True)[:50])
+    for batch in pack_batches(pending):
+        tasks.append(asyncio.create_task(run_batch(batch)))
+    total_tokens = sum(await asyncio.gather(*tasks))
+
+    if deduper:
+        selected[:] = [(k, p) for k, p in selected if deduper.is_representative(p)]
+    _remember_summaries(selected, known)
+    recent = sorted(selected, key=lambda kp: _post_date(kp[1], sightings), reverse=True)
+    alternates = deduper.alternates if deduper else {}
+    articles = [_build_article(p, known.get(k), alternates) for k, p in recent]
+    logger.info(
+        f"Summarized {len(articles)} articles (streamed from {len(all_posts)} posts), "
+        f"{total_tokens} tokens used"
+    )
+    return {
+        "date": today,
+        "article_count": len(articles),
+        "tokens_used": total_tokens,
+        "ai_model": SILICONFLOW_MODEL,
+        "articles": articles,
+    }
+
+
+def _store_summaries(batch: list[tuple[str, dict]], summaries: dict, known: dict, cache):
+    """Record a batch's fresh summaries in `known` and the persistent cache."""
+    fresh = []
+    for j, (key, post) in enumerate(batch):
+        summary_data = summaries.get(j + 1)
+        if summary_data:
+            known[key] = summary_data
+            fresh.append((key, _make_article_id(post["url"]), summary_data))
+    if cache:
+        cache.put_many(fresh)
+
+
+def _batch_limit() -> int:
+    """Most articles per batch: AI_BATCH_SIZE, or fewer if their replies wouldn't fit BATCH_MAX_TOKENS."""
+    return max(1, min(AI_BATCH_SIZE, BATCH_MAX_TOKENS // max(1, AI_SUMMARY_OUTPUT_TOKENS)))
+
+
+def _next_batch_size(items: list[tuple[str, dict]], start: int = 0) -> int:
+    """Number of items from `start` that fit one batch's article and token budgets (at least one)."""
+    limit = min(_batch_limit(), len(items) - start)
+    used = 0
+    for n in range(limit):
+        used += estimate_tokens(_article_section(n + 1, items[start + n][1]))
+        if n and used > AI_BATCH_INPUT_TOKENS:
+            return n
+    return limit
+
+
+def pack_batches(items: list[tuple[str, dict]]) -> list[list[tuple[str, dict]]]:
+    """Split (cache key, post) pairs into consecutive batches sized by estimated prompt tokens.
+
+    A batch holds at most _batch_limit() articles and AI_BATCH_INPUT_TOKENS of
+    article text, so long posts travel in smaller batches and their replies
+    are not cut off at BATCH_MAX_TOKENS.
+    """
+    batches = []
+    start = 0
+    while start < len(items):
+        n = _next_batch_size(items, start)
+        batches.append(items[start:start + n])
+        start += n
+    return batches
+
+
+def get_rate_limiter() -> TokenRateLimiter:
+    """Run-wide token limiter shared by every LLM call (global and user pipelines)."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = TokenRateLimiter(AI_TOKENS_PER_MINUTE)
+    return _rate_limiter
+
+
+def _get_batch_semaphore() -> asyncio.Semaphore:
+    """Run-wide cap on in-flight batch requests, however many callers are active."""
+    global _batch_semaphore
+    if _batch_semaphore is None:
+        _batch_semaphore = asyncio.Semaphore(max(1, AI_MAX_CONCURRENT_BATCHES))
+    return _batch_semaphore
+
+
+async def summarize_batches(
+    client: AsyncOpenAI,
+    batches: list[list[dict]],
+    custom_prompt: str | None = None,
+    on_result=None,
+) -> list[tuple[dict, int]]:
+    """Summarize batches concurrently; results are returned in batch order.
+
+    `on_result(batch_index, result)` is called as each batch finishes.
+    """
+    limiter = get_rate_limiter()
+
+    async def run(batch_num: int, batch: list[dict]) -> tuple[dict, int]:
+        logger.info(f"Processing batch {batch_num}/{len(batches)} ({len(batch)} articles)")
+        result = await _batch_summarize(client, batch, custom_prompt, limiter)
+        if on_result:
+            on_result(batch_num - 1, result)
+        return result
+
+    return await asyncio.gather(*[run(i + 1, b) for i, b in enumerate(batches)])
+
+
+def _build_article(post: dict, summary_data: dict | None, alternates: dict | None = None) -> dict:
+    """Combine a post with its AI summary, falling back to title and category tags.
+
+    `alternates` maps a representative post's url to its duplicate sources (see dedup).
+    """
+    if summary_data:
+        summary_zh = summary_data.get("summary_zh", post["title"])
+        tags = [t for t in summary_data.get("tags", []) if _validate_tag(t)]
+    else:
+        # Fallback: use title as summary, category as tag
+        summary_zh = post["title"]
+        cat = post.get("category", "")
+        tags = _category_to_tags(cat)
+
+    article = {
+        "id": _make_article_id(post["url"]),
+        "title": post["title"],
+        "url": post["url"],
+        "author": post.get("author", ""),
+        "feed_title": post.get("feed_title", ""),
+        "category": post.get("category", ""),
+        "published_at": post.get("published_at", ""),
+        "content": post.get("content", ""),
+        "summary_zh": summary_zh,
+        "tags": tags if tags else ["tools"],
+    }
+    if alternates and alternates.get(post["url"]):
+        article["alternates"] = alternates[post["url"]]
+    return article
+
+
 def _category_to_tags(category: str) -> list[str]:
     """Map OPML category to hierarchical tags as fallback."""
     cat_lower = category.lower()
@@ -200,70 +506,197 @@ def _category_to_tags(category: str) -> list[str]:
     return tags
 
 
-def _batch_summarize(client: OpenAI, batch: list[dict], custom_prompt: str | None = None) -> tuple[dict, int]:
+def _article_section(index: int, post: dict) -> str:
+    """One article's part of the batch prompt."""
+    return (
+        f"\n---\n文章 {index}:\n"
+        f"标题: {post['title']}\n"
+        f"来源: {post.get('feed_title', '')}\n"
+        f"分类: {post.get('category', '')}\n"
+        f"内容: {post_text(post)[:1500]}\n"
+    )
+
+
+def _build_batch_messages(batch: list[dict], custom_prompt: str | None = None) -> list[dict]:
+    """Render the batch summarization request: shared system prompt, then the user's part."""
+    system = BATCH_SYSTEM_PROMPT.format(
+        tags=", ".join(VALID_TOP_TAGS),
+        existing_tags=", ".join(_existing_tags()),
+    )
+    article_text = "".join(_article_section(i + 1, post) for i, post in enumerate(batch))
+    user = BATCH_USER_TEMPLATE.format(count=len(batch), articles=article_text)
+    if custom_prompt:
+        user = f"用户自定义要求：{custom_prompt}\n\n{user}"
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+def cached_tokens(usage) -> int:
+    """Prompt tokens the provider served from its prefix cache, if it reports them."""
+    if usage is None:
+        return 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details else None
+    if cached is None:
+        cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    return cached or 0
+
+
+def _strip_code_fence(content: str) -> str:
+    """Strip markdown code fences the model sometimes wraps JSON in."""
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.split("```")[1]
+        if content.startswith("json"):
+            content = content[4:]
+    return content
+
+
+def _salvage_items(text: str) -> list:
+    """Complete article objects from a truncated or malformed {"articles": [...]} reply."""
+    start = text.find("[", text.find('"articles"'))
+    if start < 0:
+        return []
+    decoder = json.JSONDecoder()
+    items = []
+    pos = text.find("{", start)
+    while pos >= 0:
+        try:
+            item, end = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            pos = text.find("{", pos + 1)
+            continue
+        items.append(item)
+        pos = text.find("{", end)
+    return items
+
+
+def _parse_batch_response(content: str, count: int) -> dict:
+    """Parse the model's JSON reply into {1-based index: {summary_zh, tags}}.
+
+    A reply cut off mid-JSON still yields the articles that were complete;
+    entries without a summary or with an index outside 1..count are dropped.
+    """
+    text = _strip_code_fence(content or "")
+    try:
+        result = json.loads(text)
+        items = result.get("articles") if isinstance(result, dict) else None
+    except json.JSONDecodeError:
+        items = _salvage_items(text)
+    if not isinstance(items, list):
+        items = []
+
+    summaries = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        idx = item.get("index")
+        if isinstance(idx, int) and 1 <= idx <= count and item.get("summary_zh"):
+            summaries[idx] = {
+                "summary_zh": item["summary_zh"],
+                "tags": item.get("tags", []),
+            }
+    return summaries
+
+
+async def _batch_summarize(
+    client: AsyncOpenAI,
+    batch: list[dict],
+    custom_prompt: str | None,
+    limiter: TokenRateLimiter,
+    splits: int = BATCH_MAX_SPLITS,
+) -> tuple[dict, int]:
     """Summarize a batch of articles in one AI call. Returns (summaries_dict, tokens).
 
     summaries_dict maps 1-based index to {"summary_zh": ..., "tags": [...]}.
-    On failure, retries once, then returns empty dict (caller uses fallback).
+    Connection errors, timeouts, rate limits and server errors don't depend on
+    the articles, so such a request is retried once as a whole and then gives
+    up. Content-dependent failures are re-asked in smaller batches instead:
+    articles missing from a reply (cut off, malformed or skipped) on their own,
+    and the whole batch in halves if nothing parsed or the API rejected it
+    (BadRequestError). Re-asks run concurrently, up to `splits` rounds deep;
+    whatever is still missing uses the fallback.
 
     Args:
-        client: OpenAI client
+        client: AsyncOpenAI client
         batch: list of post dicts
-        custom_prompt: optional user-provided prompt to prepend to the system instruction
+        custom_prompt: optional user-provided instructions, placed before the articles in the user message
+        limiter: token rate limiter the request reserves from
+        splits: remaining rounds of re-asking missing articles
     """
-    article_text = ""
-    for i, post in enumerate(batch):
-        content_snippet = (post.get("content") or "")[:1500]
-        article_text += (
-            f"\n---\n文章 {i+1}:\n"
-            f"标题: {post['title']}\n"
-            f"来源: {post.get('feed_title', '')}\n"
-            f"分类: {post.get('category', '')}\n"
-            f"内容: {content_snippet}\n"
-        )
-
-    existing_tags = _load_existing_tags()
-    prompt = BATCH_PROMPT_TEMPLATE.format(
-        count=len(batch),
-        tags=", ".join(VALID_TOP_TAGS),
-        existing_tags=", ".join(existing_tags),
-        articles=article_text,
-    )
-
-    if custom_prompt:
-        prompt = f"用户自定义要求：{custom_prompt}\n\n{prompt}"
-
-    for attempt in range(2):
+    summaries, tokens, error = await _batch_request(client, batch, custom_prompt, limiter)
+    if error is not None and not isinstance(error, BadRequestError):
+        logger.warning(f"Batch summarize attempt 1 failed, retrying: {error}")
+        summaries, more, error = await _batch_request(client, batch, custom_prompt, limiter)
+        tokens += more
+        if error is not None and not isinstance(error, BadRequestError):
+            logger.error(f"Batch summarize failed after 2 attempts: {error}")
+            return {}, tokens
+
+    missing = [i for i in range(1, len(batch) + 1) if i not in summaries]
+    if missing and (splits <= 0 or len(batch) == 1):
+        if error is not None:
+            logger.error(f"Batch summarize rejected for {len(batch)} articles: {error}")
+        return summaries, tokens
+    if not missing:
+        return summaries, tokens
+
+    if len(missing) < len(batch):
+        groups = [missing]
+    else:
+        half = len(missing) // 2
+        groups = [missing[:half], missing[half:]]
+    reason = f"rejected ({error})" if error is not None else f"missing {len(missing)}/{len(batch)} articles"
+    logger.warning(f"Batch reply {reason}, re-asking in {len(groups)} smaller batch(es)")
+    results = await asyncio.gather(*[
+        _batch_summarize(client, [batch[i - 1] for i in group], custom_prompt, limiter, splits - 1)
+        for group in groups
+    ])
+    for group, (retried, more) in zip(groups, results):
+        tokens += more
+        for j, summary_data in retried.items():
+            summaries[group[j - 1]] = summary_data
+    return summaries, tokens
+
+
+async def _batch_request(
+    client: AsyncOpenAI,
+    batch: list[dict],
+    custom_prompt: str | None,
+    limiter: TokenRateLimiter,
+) -> tuple[dict, int, Exception | None]:
+    """One batch request. Returns (summaries parsed so far, tokens, request error or None).
+
+    Holds a slot of the batch semaphore, so concurrent re-asks of a split
+    batch count toward AI_MAX_CONCURRENT_BATCHES like any other request.
+    """
+    messages = _build_batch_messages(batch, custom_prompt)
+    reserved = sum(estimate_tokens(m["content"]) for m in messages) + BATCH_MAX_TOKENS
+    async with _get_batch_semaphore():
+        await limiter.acquire(reserved)
+        tokens = 0
+        cached = 0
+        summaries = {}
+        started = time.monotonic()
         try:
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model=SILICONFLOW_MODEL,
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
                 temperature=0.3,
-                max_tokens=4000,
+                max_tokens=BATCH_MAX_TOKENS,
             )
-            content = response.choices[0].message.content.strip()
             tokens = response.usage.total_tokens if response.usage else 0
-
-            # Strip markdown code fences if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-            result = json.loads(content)
-
-            summaries = {}
-            for item in result.get("articles", []):
-                idx = item.get("index")
-                if idx is not None:
-                    summaries[idx] = {
-                        "summary_zh": item.get("summary_zh", ""),
-                        "tags": item.get("tags", []),
-                    }
-            return summaries, tokens
-
+            cached = cached_tokens(response.usage)
+            choice = response.choices[0]
+            if choice.finish_reason == "length":
+                logger.warning(f"Batch reply for {len(batch)} articles hit max_tokens, keeping complete entries")
+            summaries = _parse_batch_response(choice.message.content, len(batch))
+            _record_tags(batch, summaries)
+            return summaries, tokens, None
         except Exception as e:
-            if attempt == 0:
-                logger.warning(f"Batch summarize attempt 1 failed, retrying: {e}")
-            else:
-                logger.error(f"Batch summarize failed after 2 attempts: {e}")
-                return {}, 0
+            return {}, tokens, e
+        finally:
+            limiter.settle(reserved, tokens)
+            get_run_metrics().record_llm_call(
+                "short", len(batch), time.monotonic() - started, tokens, len(summaries) == len(batch),
+                cached_tokens=cached,
+            )
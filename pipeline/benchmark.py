@@ -0,0 +1,439 @@
+"""Offline pipeline benchmark: synthetic feeds + a fake OpenAI-compatible LLM, no network.
+
+    python -m pipeline.benchmark --feeds 100 1000 10000 [--warm] [--json out.json]
+
+A local server process serves RSS/Atom feeds (configurable size, latency and
+error rate, with ETags) and /v1/chat/completions (configurable latency, errors
+and truncated replies). Each scale runs fetch_all_feeds → summarize_articles →
+generate_content in a fresh subprocess with temporary content and state
+directories, and reports throughput and latency percentiles from the run metrics.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from html import escape
+
+logger = logging.getLogger(__name__)
+
+FAKE_TAGS = ["AI", "AI/LLM", "AI/LLM/Agent", "Engineering/Backend", "Engineering/DevOps", "Product"]
+_SYLLABLES = "ka lo mi ne ru sa ti vo ze pa qu do fe gi ha ju".split()
+WORDS = [a + b for a in _SYLLABLES for b in _SYLLABLES] + [
+    a + b + c for a in _SYLLABLES for b in _SYLLABLES for c in _SYLLABLES
+]
+
+_ARTICLE_RE = re.compile(r"文章 (\d+):")
+
+
+# --- Fake server (runs in its own process) ---
+
+class FakeServer:
+    """Synthetic feeds at /feed/{n}.xml and a fake /v1/chat/completions."""
+
+    def __init__(self, options: dict):
+        self.options = options
+        self.rng = random.Random(options["seed"])
+        self.words_per_item = max(1, options["item_bytes"] // 7)
+        self.seen_prefixes: set[str] = set()  # System prompts "cached" by the fake LLM
+
+    def item_text(self, n: int, j: int) -> str:
+        """Deterministic entry text; a dup_rate share of entries mirror feed n - 1's entry."""
+        rng = random.Random(f"{self.options['seed']}:{n}:{j}")
+        if n > 0 and rng.random() < self.options["dup_rate"]:
+            return self.item_text(n - 1, j)
+        return f"Bench post {n}-{j}\0" + " ".join(rng.choices(WORDS, k=self.words_per_item))
+
+    def feed_body(self, n: int) -> str:
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        atom = n % 2 == 1
+        entries = []
+        for j in range(self.options["items"]):
+            if j < self.options["recent"]:
+                published = now - timedelta(hours=j * 6 + n % 6)
+            else:
+                published = now - timedelta(days=3 + j)
+            title, text = self.item_text(n, j).split("\0")
+            link = f"https://bench.invalid/{n}/{j}"
+            content = escape(f"<p>{text}</p>")
+            if atom:
+                entries.append(
+                    f"<entry><title>{title}</title><link href=\"{link}\"/><id>{link}</id>"
+                    f"<updated>{published.isoformat()}</updated><author><name>Author {n}</name></author>"
+                    f"<content type=\"html\">{content}</content></entry>"
+                )
+            else:
+                entries.append(
+                    f"<item><title>{title}</title><link>{link}</link><guid>{link}</guid>"
+                    f"<pubDate>{format_datetime(published)}</pubDate><author>Author {n}</author>"
+                    f"<description>{content}</description></item>"
+                )
+        if atom:
+            return (
+                '<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                f"<title>Bench feed {n}</title>{''.join(entries)}</feed>"
+            )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+            f"<title>Bench feed {n}</title><link>https://bench.invalid/{n}</link>"
+            f"{''.join(entries)}</channel></rss>"
+        )
+
+    def completion(self, request: dict) -> dict:
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        count = max((int(i) for i in _ARTICLE_RE.findall(prompt)), default=0)
+        if count:
+            content = json.dumps({"articles": [
+                {
+                    "index": i,
+                    "summary_zh": f"基准测试摘要 {i}：" + "这是一段用于压测的中文摘要。" * 4,
+                    "tags": self.rng.sample(FAKE_TAGS, 2),
+                }
+                for i in range(1, count + 1)
+            ]}, ensure_ascii=False)
+        else:
+            content = "基准测试长摘要。" * 40
+        finish_reason = "stop"
+        if count and self.rng.random() < self.options["llm_truncate_rate"]:
+            content = content[:self.rng.randrange(len(content))]
+            finish_reason = "length"
+        prompt_tokens = len(prompt.encode("utf-8")) // 3
+        completion_tokens = len(content.encode("utf-8")) // 3
+        # Emulate provider prefix caching of a repeated system message
+        cached_tokens = 0
+        messages = request.get("messages", [])
+        if messages and messages[0].get("role") == "system":
+            system = str(messages[0].get("content", ""))
+            if system in self.seen_prefixes:
+                cached_tokens = len(system.encode("utf-8")) // 3
+            self.seen_prefixes.add(system)
+        return {
+            "id": "bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "bench"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        }
+
+    async def _delay(self, mean_ms: float, jitter_ms: float):
+        delay = mean_ms + (self.rng.expovariate(1 / jitter_ms) if jitter_ms > 0 else 0)
+        await asyncio.sleep(delay / 1000)
+
+    async def route(self, method: str, path: str, headers: dict, body: bytes):
+        """Return (status, content type, payload, extra headers)."""
+        match = re.fullmatch(r"/feed/(\d+)\.xml", path)
+        if method == "GET" and match:
+            await self._delay(self.options["feed_latency_ms"], self.options["feed_jitter_ms"])
+            if self.rng.random() < self.options["error_rate"]:
+                return 500, "text/plain", b"injected error", {}
+            etag = f'"bench-{match.group(1)}"'
+            if headers.get("if-none-match") == etag:
+                return 304, "text/plain", b"", {"ETag": etag}
+            payload = self.feed_body(int(match.group(1))).encode("utf-8")
+            return 200, "application/xml; charset=utf-8", payload, {"ETag": etag}
+
+        if method == "POST" and path.endswith("/chat/completions"):
+            await self._delay(self.options["llm_latency_ms"], self.options["llm_jitter_ms"])
+            if self.rng.random() < self.options["llm_error_rate"]:
+                return 500, "application/json", b'{"error": {"message": "injected"}}', {}
+            payload = json.dumps(self.completion(json.loads(body)), ensure_ascii=False)
+            return 200, "application/json", payload.encode("utf-8"), {}
+
+        return 404, "text/plain", b"not found", {}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Minimal HTTP/1.1 with keep-alive."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, content_type, payload, extra = await self.route(method, path, headers, body)
+                head = [f"HTTP/1.1 {status} X", f"Content-Type: {content_type}",
+                        f"Content-Length: {len(payload)}"]
+                head += [f"{k}: {v}" for k, v in extra.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def _serve(options: dict, ready):
+    async def main():
+        server = FakeServer(options)
+        first = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = first.sockets[0].getsockname()[1]
+        hosts = ["127.0.0.1"]
+        # Spread feeds over loopback addresses so the per-host limit doesn't cap throughput
+        for k in range(2, options["hosts"] + 1):
+            try:
+                await asyncio.start_server(server.handle, f"127.0.0.{k}", port)
+                hosts.append(f"127.0.0.{k}")
+            except OSError:
+                break
+        ready.put((port, hosts))
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+# --- One scale (runs in a fresh subprocess with temporary dirs) ---
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+
+    def pick(p: float) -> float:
+        return round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 1)
+
+    return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": round(values[-1] * 1000, 1)}
+
+
+def _fetch_summary(records: list[dict], seconds: float) -> dict:
+    statuses: dict[str, int] = {}
+    for record in records:
+        statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+    return {
+        "seconds": round(seconds, 3),
+        "feeds_per_s": round(len(records) / seconds, 1) if seconds else 0,
+        "mib": round(sum(r.get("bytes", 0) for r in records) / 2**20, 2),
+        "latency_ms": _percentiles([r["latency_s"] for r in records if "latency_s" in r]),
+        "statuses": statuses,
+    }
+
+
+async def _run_scale(feed_count: int, port: int, hosts: list[str], warm: bool) -> dict:
+    from pipeline.ai_summarizer import summarize_articles
+    from pipeline.content_generator import generate_content
+    from pipeline.feed_fetcher import create_http_client, fetch_all_feeds
+    from pipeline.metrics import get_run_metrics, write_run_report
+    from pipeline.seen_entries import close_seen_index
+    from pipeline.summary_cache import close_summary_cache
+
+    feeds = [
+        {
+            "title": f"Bench feed {n}",
+            "xml_url": f"http://{hosts[n % len(hosts)]}:{port}/feed/{n}.xml",
+            "html_url": f"https://bench.invalid/{n}",
+            "category": "Bench",
+        }
+        for n in range(feed_count)
+    ]
+    metrics = get_run_metrics()
+    async with create_http_client() as client:
+        with metrics.stage("fetch"):
+            posts = await fetch_all_feeds(feeds, client)
+        with metrics.stage("summarize"):
+            articles_data = await summarize_articles(posts)
+        with metrics.stage("generate"):
+            generate_content(articles_data, feeds)
+        cold_records = list(metrics.feeds)
+        if warm:
+            with metrics.stage("fetch_warm"):
+                await fetch_all_feeds(feeds, client)
+    close_summary_cache()
+    close_seen_index()
+    write_run_report()
+
+    report = metrics.report()
+    stages = report["stages_s"]
+    articles = articles_data["article_count"]
+    result = {
+        "feeds": feed_count,
+        "posts": len(posts),
+        "articles": articles,
+        "fetch": _fetch_summary(cold_records, stages["fetch"]),
+        "summarize": {
+            "seconds": stages["summarize"],
+            "articles_per_s": round(articles / stages["summarize"], 1) if stages["summarize"] else 0,
+            "llm_calls": len(metrics.llm_calls),
+            "llm_failed": sum(not c["ok"] for c in metrics.llm_calls),
+            "llm_latency_ms": _percentiles([c["latency_s"] for c in metrics.llm_calls]),
+            "tokens": articles_data["tokens_used"],
+            "cached_tokens": sum(c["cached_tokens"] for c in metrics.llm_calls),
+        },
+        "generate": {
+            "seconds": stages["generate"],
+            "articles_per_s": round(articles / stages["generate"], 1) if stages["generate"] else 0,
+        },
+        "resources": report["resources"],
+    }
+    if warm:
+        result["fetch_warm"] = _fetch_summary(metrics.feeds[len(cold_records):], stages["fetch_warm"])
+    return result
+
+
+def _run_scale_subprocess(feed_count: int, port: int, hosts: list[str], args) -> dict | None:
+    workdir = tempfile.mkdtemp(prefix=f"pipeline-bench-{feed_count}-")
+    result_path = os.path.join(workdir, "result.json")
+    env = {
+        **os.environ,
+        "PIPELINE_CONTENT_DIR": os.path.join(workdir, "content"),
+        "PIPELINE_STATE_DIR": os.path.join(workdir, "state"),
+        "RUN_REPORT_PATH": os.path.join(workdir, "run-report.json"),
+        "SILICONFLOW_BASE_URL": f"http://127.0.0.1:{port}/v1",
+        "SILICONFLOW_API_KEY": "bench",
+        # The warm pass refetches at once, which the polling schedule would skip
+        "FEED_SCHEDULER_ENABLED": os.environ.get("FEED_SCHEDULER_ENABLED", "0"),
+    }
+    command = [
+        sys.executable, "-m", "pipeline.benchmark", "--worker", str(feed_count),
+        "--port", str(port), "--hosts-list", ",".join(hosts), "--result", result_path,
+    ]
+    if args.warm:
+        command.append("--warm")
+    try:
+        proc = subprocess.run(command, env=env)
+        if proc.returncode != 0:
+            logger.error(f"Benchmark at {feed_count} feeds failed (exit {proc.returncode})")
+            return None
+        with open(result_path, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        if args.keep:
+            logger.info(f"Kept benchmark output in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _print_table(results: list[dict]):
+    def pct(p: dict) -> str:
+        return f"{p.get('p50', 0):.0f}/{p.get('p90', 0):.0f}/{p.get('p99', 0):.0f}"
+
+    header = (
+        f"{'feeds':>7} {'posts':>7} {'articles':>8} | {'fetch s':>8} {'feeds/s':>8} "
+        f"{'p50/p90/p99 ms':>15} | {'summ s':>7} {'calls':>6} {'llm p50/p90/p99':>16} "
+        f"{'art/s':>7} | {'gen s':>6} | {'RSS MiB':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        fetch, summ = r["fetch"], r["summarize"]
+        print(
+            f"{r['feeds']:>7} {r['posts']:>7} {r['articles']:>8} | {fetch['seconds']:>8.2f} "
+            f"{fetch['feeds_per_s']:>8.1f} {pct(fetch['latency_ms']):>15} | "
+            f"{summ['seconds']:>7.2f} {summ['llm_calls']:>6} {pct(summ['llm_latency_ms']):>16} "
+            f"{summ['articles_per_s']:>7.1f} | {r['generate']['seconds']:>6.2f} | "
+            f"{r['resources'].get('peak_rss_mib', 0):>7.1f}"
+        )
+        if "fetch_warm" in r:
+            warm = r["fetch_warm"]
+            print(
+                f"{'':>7} {'warm':>7} {'':>8} | {warm['seconds']:>8.2f} {warm['feeds_per_s']:>8.1f} "
+                f"{pct(warm['latency_ms']):>15} | statuses {warm['statuses']}"
+            )
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--feeds", type=int, nargs="+", default=[100, 1000], help="scales to run")
+    parser.add_argument("--items", type=int, default=20, help="entries per feed")
+    parser.add_argument("--recent", type=int, default=2, help="entries per feed within the last day")
+    parser.add_argument("--item-bytes", type=int, default=1500, help="approximate entry content size")
+    parser.add_argument("--feed-latency-ms", type=float, default=50)
+    parser.add_argument("--feed-jitter-ms", type=float, default=50, help="mean of exponential extra latency")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="fraction of feed requests failing with 500")
+    parser.add_argument("--dup-rate", type=float, default=0.05, help="fraction of entries mirroring another feed's")
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-truncate-rate", type=float, default=0.0,
+                        help="fraction of batch replies cut off mid-JSON")
+    parser.add_argument("--hosts", type=int, default=32, help="loopback addresses to spread feeds over")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--warm", action="store_true", help="refetch afterwards to measure conditional GETs")
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--keep", action="store_true", help="keep each scale's temporary output")
+    # Internal: run one scale inside the worker subprocess
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--hosts-list", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.WARNING if args.worker is None else logging.ERROR,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+
+    if args.worker is not None:
+        result = asyncio.run(_run_scale(args.worker, args.port, args.hosts_list.split(","), args.warm))
+        with open(args.result, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return
+
+    options = {
+        "seed": args.seed,
+        "items": args.items,
+        "recent": args.recent,
+        "item_bytes": args.item_bytes,
+        "feed_latency_ms": args.feed_latency_ms,
+        "feed_jitter_ms": args.feed_jitter_ms,
+        "error_rate": args.error_rate,
+        "dup_rate": args.dup_rate,
+        "llm_latency_ms": args.llm_latency_ms,
+        "llm_jitter_ms": args.llm_jitter_ms,
+        "llm_error_rate": args.llm_error_rate,
+        "llm_truncate_rate": args.llm_truncate_rate,
+        "hosts": args.hosts,
+    }
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Queue()
+    server = ctx.Process(target=_serve, args=(options, ready), daemon=True)
+    server.start()
+    try:
+        port, hosts = ready.get(timeout=30)
+        if len(hosts) < args.hosts:
+            logger.warning(f"Only {len(hosts)} loopback address(es) usable; per-host limits will apply")
+
+        results = []
+        for feed_count in args.feeds:
+            print(f"Running {feed_count} feeds...", file=sys.stderr)
+            result = _run_scale_subprocess(feed_count, port, hosts, args)
+            if result:
+                results.append(result)
+    finally:
+        server.terminate()
+        server.join()
+
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"options": options, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Run checkpoints: each finished stage's output, so an interrupted run can resume.
+
+A checkpoint belongs to one day's run. `python -m pipeline.run --resume` skips
+the stages an unfinished run already completed today; summary batches that
+finished before an interruption come back from the summary cache. The stage
+subcommands (fetch / summarize / generate) read and write the same files.
+"""
+
+import json
+import logging
+from datetime import date, datetime, timezone
+
+from pipeline.config import CHECKPOINT_DIR
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("fetch", "summarize", "generate")
+_STATE_PATH = CHECKPOINT_DIR / "state.json"
+
+
+def _load_state() -> dict:
+    """Today's checkpoint state: {date, stages: {name: finished_at}, complete}."""
+    if not _STATE_PATH.exists():
+        return {}
+    try:
+        state = json.loads(_STATE_PATH.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable checkpoint {_STATE_PATH}: {e}")
+        return {}
+    return state if state.get("date") == date.today().isoformat() else {}
+
+
+def _write_json(path, data):
+    CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+def resumable_stages() -> set[str]:
+    """Stages an unfinished run completed today (empty once a run has completed)."""
+    state = _load_state()
+    return set() if state.get("complete") else set(state.get("stages", {}))
+
+
+def save_stage(stage: str, data=None):
+    """Checkpoint a finished stage and its output; later stages' checkpoints become stale."""
+    if data is not None:
+        _write_json(CHECKPOINT_DIR / f"{stage}.json", data)
+    state = _load_state()
+    earlier = STAGES[:STAGES.index(stage)]
+    stages = {name: t for name, t in state.get("stages", {}).items() if name in earlier}
+    stages[stage] = datetime.now(timezone.utc).isoformat()
+    _write_json(_STATE_PATH, {"date": date.today().isoformat(), "stages": stages, "complete": False})
+    logger.info(f"Checkpointed stage {stage}")
+
+
+def load_stage(stage: str):
+    """A stage's checkpointed output from today, or None."""
+    if stage not in _load_state().get("stages", {}):
+        return None
+    path = CHECKPOINT_DIR / f"{stage}.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def complete_run():
+    """Mark today's run finished, so a later --resume starts a fresh run."""
+    state = _load_state()
+    if state:
+        state["complete"] = True
+        _write_json(_STATE_PATH, state)
@@ -6,26 +6,87 @@ from pathlib import Path
 # Paths
 BASE_DIR = Path(__file__).resolve().parent.parent
 FEEDS_OPML = BASE_DIR / "feeds.opml"
-CONTENT_DIR = BASE_DIR / "site" / "content"
+CONTENT_DIR = Path(os.getenv("PIPELINE_CONTENT_DIR", BASE_DIR / "site" / "content"))
 ARTICLES_DIR = CONTENT_DIR / "articles"
 ARTICLE_CONTENT_DIR = CONTENT_DIR / "article-content"  # Individual article content files
+ARTICLE_BUNDLE_DIR = CONTENT_DIR / "article-bundles"  # Date-sharded compressed content bundles
+SEARCH_INDEX_PATH = CONTENT_DIR / "search-index.json"  # Inverted index for /api/search
+TAG_FACETS_PATH = CONTENT_DIR / "tag-facets.json"  # Tag counts and tag → article postings
+STATE_DIR = Path(os.getenv("PIPELINE_STATE_DIR", BASE_DIR / ".pipeline-state"))  # Cross-run caches (not committed)
 
 # Ensure output dirs exist
 CONTENT_DIR.mkdir(parents=True, exist_ok=True)
 ARTICLES_DIR.mkdir(parents=True, exist_ok=True)
 ARTICLE_CONTENT_DIR.mkdir(parents=True, exist_ok=True)
+STATE_DIR.mkdir(parents=True, exist_ok=True)
+
+CONTENT_STORAGE = os.getenv("CONTENT_STORAGE", "files")  # files | bundles (see content_bundles.py)
+CONTENT_MANIFEST_PATH = STATE_DIR / "content_manifest.json"  # Hashes of files written last run
 
 # API
 SILICONFLOW_API_KEY = os.getenv("SILICONFLOW_API_KEY", "")
 SILICONFLOW_MODEL = os.getenv("SILICONFLOW_MODEL", "deepseek-ai/DeepSeek-V3.2")
+SILICONFLOW_BASE_URL = os.getenv("SILICONFLOW_BASE_URL", "https://api.siliconflow.cn/v1")
+
+# Pipeline
+PIPELINE_STREAMING = os.getenv("PIPELINE_STREAMING", "0") == "1"  # Overlap fetch → summarize → write
+RUN_REPORT_PATH = Path(os.getenv("RUN_REPORT_PATH", CONTENT_DIR / "run-report.json"))  # Timing/resource report
+PIPELINE_PROFILE = os.getenv("PIPELINE_PROFILE", "0") == "1"  # Also dump cProfile stats next to the report
+CHECKPOINT_DIR = STATE_DIR / "checkpoint"  # Per-stage outputs of today's run, for --resume
 
 # Fetcher
 FETCHER_MAX_CONCURRENT = int(os.getenv("FETCHER_MAX_CONCURRENT", "20"))
 FETCHER_TIMEOUT = int(os.getenv("FETCHER_TIMEOUT", "15"))
+FETCHER_MIN_TIMEOUT = int(os.getenv("FETCHER_MIN_TIMEOUT", "5"))  # Floor for latency-sized timeouts
+FETCHER_TIMEOUT_FACTOR = float(os.getenv("FETCHER_TIMEOUT_FACTOR", "4"))  # Timeout = factor × latency EWMA
+FETCHER_MAX_PER_HOST = int(os.getenv("FETCHER_MAX_PER_HOST", "4"))  # Upper bound of the adaptive per-host limit
+FETCHER_KEEPALIVE = int(os.getenv("FETCHER_KEEPALIVE", "20"))
+FETCHER_HTTP2 = os.getenv("FETCHER_HTTP2", "1") == "1"  # Needs the optional h2 package
+FETCHER_PARSE_MODE = os.getenv("FETCHER_PARSE_MODE", "process")  # process | thread | inline
+FETCHER_PARSE_WORKERS = int(os.getenv("FETCHER_PARSE_WORKERS", str(os.cpu_count() or 2)))
+FEED_CACHE_ENABLED = os.getenv("FEED_CACHE_ENABLED", "1") == "1"
+FEED_CACHE_PATH = STATE_DIR / "feed_cache.json"
+FEED_CACHE_MAX_AGE_DAYS = int(os.getenv("FEED_CACHE_MAX_AGE_DAYS", "30"))
+FEED_HEALTH_PATH = STATE_DIR / "feed_health.json"  # Latency EWMA and failure streak per feed
+FEED_BACKOFF_AFTER = int(os.getenv("FEED_BACKOFF_AFTER", "2"))  # Consecutive failures before skipping runs
+FEED_BACKOFF_BASE_HOURS = float(os.getenv("FEED_BACKOFF_BASE_HOURS", "20"))  # Doubles per further failure
+FEED_BACKOFF_MAX_HOURS = float(os.getenv("FEED_BACKOFF_MAX_HOURS", "168"))
+FEED_SCHEDULER_ENABLED = os.getenv("FEED_SCHEDULER_ENABLED", "1") == "1"  # Only poll feeds that are due
+FEED_POLL_MIN_MINUTES = float(os.getenv("FEED_POLL_MIN_MINUTES", "30"))
+FEED_POLL_MAX_HOURS = float(os.getenv("FEED_POLL_MAX_HOURS", "24"))  # Every feed is polled at least this often
+FEED_POLL_CADENCE_FACTOR = float(os.getenv("FEED_POLL_CADENCE_FACTOR", "0.5"))  # Poll interval / publish gap
 
 # AI
-AI_BATCH_SIZE = int(os.getenv("AI_BATCH_SIZE", "12"))
+AI_BATCH_SIZE = int(os.getenv("AI_BATCH_SIZE", "12"))  # Most articles per batch request
+AI_BATCH_INPUT_TOKENS = int(os.getenv("AI_BATCH_INPUT_TOKENS", "12000"))  # Estimated article tokens per batch
+AI_SUMMARY_OUTPUT_TOKENS = int(os.getenv("AI_SUMMARY_OUTPUT_TOKENS", "250"))  # Reply tokens budgeted per article
+AI_MAX_CONCURRENT_BATCHES = int(os.getenv("AI_MAX_CONCURRENT_BATCHES", "4"))
+AI_REQUEST_TIMEOUT = float(os.getenv("AI_REQUEST_TIMEOUT", "180"))  # Seconds per LLM request attempt
+AI_PROMPT_TAG_LIMIT = int(os.getenv("AI_PROMPT_TAG_LIMIT", "80"))  # Subtags listed in the prompt
+AI_PROMPT_TAG_REFRESH = int(os.getenv("AI_PROMPT_TAG_REFRESH", "10"))  # New top subtags before the list is re-rendered
+AI_TOKENS_PER_MINUTE = int(os.getenv("AI_TOKENS_PER_MINUTE", "0"))  # 0 = unlimited
+AI_LONG_BATCH_SIZE = int(os.getenv("AI_LONG_BATCH_SIZE", "3"))  # Articles per long-summary request
+AI_MAX_CONCURRENT_LONG = int(os.getenv("AI_MAX_CONCURRENT_LONG", "4"))  # In-flight long-summary requests
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "1") == "1"
+SUMMARY_CACHE_PATH = STATE_DIR / "summary_cache.sqlite3"
+SUMMARY_CACHE_MAX_AGE_DAYS = int(os.getenv("SUMMARY_CACHE_MAX_AGE_DAYS", "14"))
+SUMMARY_CACHE_MAX_ROWS = int(os.getenv("SUMMARY_CACHE_MAX_ROWS", "50000"))
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"  # Fold reposts/mirrors before summarizing
+DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "6"))  # SimHash bits out of 64
+DEDUP_MIN_TOKENS = int(os.getenv("DEDUP_MIN_TOKENS", "30"))  # Shorter texts only dedupe by URL
+SEEN_INDEX_ENABLED = os.getenv("SEEN_INDEX_ENABLED", "1") == "1"
+SEEN_INDEX_PATH = STATE_DIR / "seen_entries.sqlite3"  # First-seen time and last summary per entry
+SEEN_INDEX_MAX_AGE_DAYS = int(os.getenv("SEEN_INDEX_MAX_AGE_DAYS", "90"))
 
 # Supabase (for user feeds pipeline)
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+# User pipeline scheduling
+USER_MAX_CONCURRENT = int(os.getenv("USER_MAX_CONCURRENT", "8"))
+USER_MAX_CONCURRENT_PRO = int(os.getenv("USER_MAX_CONCURRENT_PRO", "4"))  # Pro users share these slots
+USER_TIMEOUT = int(os.getenv("USER_TIMEOUT", "300"))  # Seconds per user
+SUPABASE_UPSERT_MAX_BYTES = int(os.getenv("SUPABASE_UPSERT_MAX_BYTES", str(2 * 1024 * 1024)))
+SUPABASE_UPSERT_MAX_ROWS = int(os.getenv("SUPABASE_UPSERT_MAX_ROWS", "500"))
+SUPABASE_WRITE_CONCURRENCY = int(os.getenv("SUPABASE_WRITE_CONCURRENCY", "4"))
+USER_ROW_HASHES_PATH = STATE_DIR / "user_row_hashes.json"  # Skip re-upserting unchanged rows
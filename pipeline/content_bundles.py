@@ -0,0 +1,196 @@
+"""Compact article-content storage: date-sharded bundles of gzip records + offset index.
+
+Layout under site/content/article-bundles/:
+  - {date}.bin   concatenated, independently gzipped JSON records
+  - index.json   {id: [shard, offset, length, content_hash]}
+
+Each record is compressed on its own, so a reader fetches one article with
+a single seek + read + gunzip. Records are appended; an article whose
+content is unchanged keeps its existing location. A changed record leaves
+its old bytes behind, so once a shard's live records fall below COMPACT_BELOW
+of its size, it is rewritten as the shard's next generation ({date}.{n}.bin)
+and the old file is removed after the index points at the new one.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+from pipeline.config import ARTICLE_BUNDLE_DIR, ARTICLES_DIR, ARTICLE_CONTENT_DIR
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = ARTICLE_BUNDLE_DIR / "index.json"
+COMPACT_BELOW = 0.75  # Rewrite a shard once live records are under this share of its bytes
+
+
+def load_bundle_index() -> dict[str, list]:
+    if not INDEX_PATH.exists():
+        return {}
+    return json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+
+
+def _shard_path(shard: str):
+    return ARTICLE_BUNDLE_DIR / f"{shard}.bin"
+
+
+def _current_shard(index: dict[str, list], base: str) -> str:
+    """Shard that `base` (date) records are appended to: its latest generation."""
+    gens = [
+        int(gen or 0)
+        for name, _, gen in (entry[0].partition(".") for entry in index.values())
+        if name == base
+    ]
+    gen = max(gens, default=0)
+    return f"{base}.{gen}" if gen else base
+
+
+def _save_index(index: dict[str, list]):
+    tmp = INDEX_PATH.with_name(f".{INDEX_PATH.name}.tmp")
+    tmp.write_text(
+        json.dumps(index, ensure_ascii=False, sort_keys=True, separators=(",", ":")),
+        encoding="utf-8",
+    )
+    os.replace(tmp, INDEX_PATH)
+
+
+def _compact(index: dict[str, list], shard: str):
+    """Copy a mostly-dead shard's live records into its next generation, updating `index`.
+
+    Returns the old shard file to delete once the index is saved, or None if
+    the shard is still compact enough.
+    """
+    path = _shard_path(shard)
+    size = path.stat().st_size if path.exists() else 0
+    entries = sorted((entry[1], article_id) for article_id, entry in index.items() if entry[0] == shard)
+    live = sum(index[article_id][2] for _, article_id in entries)
+    if not size or live >= COMPACT_BELOW * size:
+        return None
+    if entries:
+        base, _, gen = shard.partition(".")
+        new_shard = f"{base}.{int(gen or 0) + 1}"
+        with open(path, "rb") as src, open(_shard_path(new_shard), "wb") as dst:
+            offset = 0
+            for old_offset, article_id in entries:
+                src.seek(old_offset)
+                blob = src.read(index[article_id][2])
+                dst.write(blob)
+                index[article_id] = [new_shard, offset, len(blob), index[article_id][3]]
+                offset += len(blob)
+            dst.flush()
+            os.fsync(dst.fileno())
+        logger.info(f"Compacted {path.name} into {new_shard}.bin: {size} → {live} bytes")
+    return path
+
+
+def write_bundle_records(shard: str, records: list[dict]) -> tuple[int, int]:
+    """Append new or changed records to the `shard` bundle and update the index.
+
+    Shards left mostly dead by the changed records are compacted.
+
+    Args:
+        shard: Shard name, normally the articles date (YYYY-MM-DD).
+        records: Dicts with at least "id"; stored as-is.
+
+    Returns:
+        (written, unchanged) record counts.
+    """
+    ARTICLE_BUNDLE_DIR.mkdir(parents=True, exist_ok=True)
+    index = load_bundle_index()
+    shard = _current_shard(index, shard)
+    shard_path = _shard_path(shard)
+
+    pending = {}
+    for record in records:
+        encoded = json.dumps(record, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        digest = hashlib.sha256(encoded).hexdigest()[:16]
+        entry = index.get(record["id"])
+        if entry and entry[3] == digest:
+            continue
+        pending[record["id"]] = (encoded, digest)
+
+    if pending:
+        touched = {shard} | {index[article_id][0] for article_id in pending if article_id in index}
+        with open(shard_path, "ab") as f:
+            offset = f.tell()
+            for article_id, (encoded, digest) in pending.items():
+                blob = gzip.compress(encoded, mtime=0)
+                f.write(blob)
+                index[article_id] = [shard, offset, len(blob), digest]
+                offset += len(blob)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # The index is swapped in only after the shard data is durable,
+        # and replaced shard files are removed only after that
+        dead = [path for path in (_compact(index, s) for s in sorted(touched)) if path]
+        _save_index(index)
+        for path in dead:
+            path.unlink()
+
+    logger.info(
+        f"Article bundle {shard_path.name}: {len(pending)} records written, "
+        f"{len(records) - len(pending)} unchanged ({len(index)} indexed)"
+    )
+    return len(pending), len(records) - len(pending)
+
+
+def read_bundle_record(article_id: str, index: dict[str, list] | None = None) -> dict | None:
+    """Read one record with a single seek, or None if the id is not bundled."""
+    if index is None:
+        index = load_bundle_index()
+    entry = index.get(article_id)
+    if not entry:
+        return None
+    shard, offset, length = entry[0], entry[1], entry[2]
+    with open(ARTICLE_BUNDLE_DIR / f"{shard}.bin", "rb") as f:
+        f.seek(offset)
+        return json.loads(gzip.decompress(f.read(length)))
+
+
+def migrate_content_files(delete: bool = False):
+    """Move existing article-content/{id}.json files into date bundles.
+
+    Each article goes into the shard of the first date listing it.
+    """
+    migrated = set()
+    for list_path in sorted(ARTICLES_DIR.glob("????-??-??.json")):
+        data = json.loads(list_path.read_text(encoding="utf-8"))
+        records = []
+        for article in data.get("articles", []):
+            path = ARTICLE_CONTENT_DIR / f"{article['id']}.json"
+            if article["id"] in migrated or not path.exists():
+                continue
+            records.append(json.loads(path.read_text(encoding="utf-8")))
+            migrated.add(article["id"])
+        if records:
+            write_bundle_records(list_path.stem, records)
+
+    compact_bundles()
+    if delete:
+        for article_id in migrated:
+            (ARTICLE_CONTENT_DIR / f"{article_id}.json").unlink()
+    logger.info(f"Migrated {len(migrated)} content files into bundles")
+
+
+def compact_bundles():
+    """Compact every shard holding dead records and remove shard files nothing points to."""
+    index = load_bundle_index()
+    shards = {entry[0] for entry in index.values()}
+    dead = [path for path in (_compact(index, s) for s in sorted(shards)) if path]
+    dead += [path for path in ARTICLE_BUNDLE_DIR.glob("*.bin") if path.stem not in shards]
+    if index:
+        _save_index(index)
+    for path in set(dead):
+        if path.exists():
+            path.unlink()
+    logger.info(f"Bundle compaction: {len(set(dead))} shard files replaced or removed")
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    migrate_content_files(delete="--delete" in sys.argv)
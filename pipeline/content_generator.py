@@ -1,10 +1,18 @@
 """Generate static content files from articles data."""
 
+import hashlib
 import json
 import logging
+import os
 from pathlib import Path
 
-from pipeline.config import CONTENT_DIR, ARTICLES_DIR, ARTICLE_CONTENT_DIR
+from pipeline.config import (
+    CONTENT_DIR, ARTICLES_DIR, ARTICLE_CONTENT_DIR, CONTENT_MANIFEST_PATH, CONTENT_STORAGE,
+    SEARCH_INDEX_PATH, TAG_FACETS_PATH,
+)
+from pipeline.content_bundles import write_bundle_records
+from pipeline.search_index import build_search_index
+from pipeline.tag_facets import build_tag_facets
 
 logger = logging.getLogger(__name__)
 
@@ -15,32 +23,26 @@ def generate_content(articles_data: dict, feeds: list[dict]):
     Creates:
       - site/content/articles/{date}.json (without content field)
       - site/content/articles/latest.json (without content field)
-      - site/content/article-content/{id}.json (individual article content)
+      - site/content/article-content/{id}.json (individual article content), or
+        site/content/article-bundles/{date}.bin + index.json when CONTENT_STORAGE=bundles
       - site/content/feeds.json
       - site/content/index.json (archive index)
+      - site/content/search-index.json (inverted search index)
+      - site/content/tag-facets.json (tag counts and tag → article postings)
+
+    Files whose content hash is unchanged are left untouched; the rest are
+    written atomically. A manifest of written/unchanged files is saved to
+    the pipeline state directory.
     """
     articles_date = articles_data["date"]
+    manifest = _new_manifest()
 
-    # 1. Write individual article content files and strip content from main data
-    articles_for_list = []
-    for article in articles_data["articles"]:
-        article_id = article["id"]
-        content = article.get("content", "")
-
-        # Write individual content file
-        content_file = ARTICLE_CONTENT_DIR / f"{article_id}.json"
-        _write_json(content_file, {
-            "id": article_id,
-            "title": article["title"],
-            "url": article["url"],
-            "content": content,
-        })
-
-        # Create article entry without content for the list
-        article_without_content = {k: v for k, v in article.items() if k != "content"}
-        articles_for_list.append(article_without_content)
-
-    logger.info(f"Wrote {len(articles_for_list)} individual content files to {ARTICLE_CONTENT_DIR}")
+    # 1. Write article content (individual files or a date bundle) and strip content from main data
+    write_article_contents(articles_date, articles_data["articles"], manifest)
+    articles_for_list = [
+        {k: v for k, v in article.items() if k != "content"}
+        for article in articles_data["articles"]
+    ]
 
     # 2. Write articles JSON (without content field)
     articles_list_data = {
@@ -52,13 +54,13 @@ def generate_content(articles_data: dict, feeds: list[dict]):
     }
 
     articles_json_path = ARTICLES_DIR / f"{articles_date}.json"
-    _write_json(articles_json_path, articles_list_data)
-    logger.info(f"Wrote {articles_json_path}")
+    written = _write_json(articles_json_path, articles_list_data, manifest)
+    logger.info(f"{'Wrote' if written else 'Unchanged'} {articles_json_path}")
 
     # 3. Write latest.json (same content, easy access)
     latest_path = ARTICLES_DIR / "latest.json"
-    _write_json(latest_path, articles_list_data)
-    logger.info(f"Wrote {latest_path}")
+    written = _write_json(latest_path, articles_list_data, manifest)
+    logger.info(f"{'Wrote' if written else 'Unchanged'} {latest_path}")
 
     # 4. Write feeds.json
     feeds_data = {
@@ -67,14 +69,53 @@ def generate_content(articles_data: dict, feeds: list[dict]):
         "feeds": feeds,
     }
     feeds_path = CONTENT_DIR / "feeds.json"
-    _write_json(feeds_path, feeds_data)
-    logger.info(f"Wrote {feeds_path}")
+    written = _write_json(feeds_path, feeds_data, manifest)
+    logger.info(f"{'Wrote' if written else 'Unchanged'} {feeds_path}")
 
     # 5. Update archive index
-    _update_index(articles_date, articles_data["article_count"])
+    _update_index(articles_date, articles_data["article_count"], manifest)
+
+    # 6. Update search index with this date's articles
+    search_index = build_search_index(articles_date, articles_for_list)
+    _write_json(SEARCH_INDEX_PATH, search_index, manifest, indent=None)
+
+    # 7. Update tag facets with this date's articles
+    tag_facets = build_tag_facets(articles_date, articles_for_list)
+    _write_json(TAG_FACETS_PATH, tag_facets, manifest, indent=None)
+
+    _save_manifest(manifest)
+
 
+def write_article_contents(articles_date: str, articles: list[dict], manifest: dict | None = None):
+    """Write the content of articles, as individual files or into the date bundle.
 
-def _update_index(articles_date: str, article_count: int):
+    Called by generate_content, and by the streaming pipeline as each batch finishes.
+    """
+    records = [
+        {
+            "id": article["id"],
+            "title": article["title"],
+            "url": article["url"],
+            "content": article.get("content", ""),
+        }
+        for article in articles
+    ]
+
+    if CONTENT_STORAGE == "bundles":
+        write_bundle_records(articles_date, records)
+        return
+
+    written = sum(
+        _write_json(ARTICLE_CONTENT_DIR / f"{record['id']}.json", record, manifest)
+        for record in records
+    )
+    logger.info(
+        f"Content files in {ARTICLE_CONTENT_DIR}: {written} written, "
+        f"{len(records) - written} unchanged"
+    )
+
+
+def _update_index(articles_date: str, article_count: int, manifest: dict | None = None):
     """Update the archive index.json with a new entry."""
     index_path = CONTENT_DIR / "index.json"
     if index_path.exists():
@@ -101,12 +142,66 @@ def _update_index(articles_date: str, article_count: int):
     entries.sort(key=lambda e: e["date"], reverse=True)
     index["entries"] = entries
 
-    _write_json(index_path, index)
+    _write_json(index_path, index, manifest)
     logger.info(f"Updated archive index: {len(entries)} entries")
 
 
-def _write_json(path: Path, data: dict):
-    path.write_text(
-        json.dumps(data, ensure_ascii=False, indent=2),
-        encoding="utf-8",
+def _write_json(path: Path, data: dict, manifest: dict | None = None, indent: int | None = 2) -> bool:
+    """Write JSON atomically, skipping the write if the content is unchanged.
+
+    Returns True if the file was written.
+    """
+    separators = None if indent is not None else (",", ":")
+    encoded = json.dumps(data, ensure_ascii=False, indent=indent, separators=separators).encode("utf-8")
+    digest = hashlib.sha256(encoded).hexdigest()
+    name = _manifest_name(path)
+
+    # Trust last run's hash when the size still matches; otherwise hash the file
+    unchanged = path.exists() and path.stat().st_size == len(encoded) and (
+        (manifest is not None and manifest["previous"].get(name) == digest)
+        or _file_hash(path) == digest
+    )
+    if not unchanged:
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_bytes(encoded)
+        os.replace(tmp, path)
+
+    if manifest is not None:
+        manifest["hashes"][name] = digest
+        manifest["unchanged" if unchanged else "written"].append(name)
+    return not unchanged
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _manifest_name(path: Path) -> str:
+    try:
+        return path.relative_to(CONTENT_DIR).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def _new_manifest() -> dict:
+    """Start a run manifest, seeded with last run's hashes to avoid re-reading files."""
+    previous = {}
+    if CONTENT_MANIFEST_PATH.exists():
+        try:
+            previous = json.loads(CONTENT_MANIFEST_PATH.read_text(encoding="utf-8")).get("hashes", {})
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable content manifest: {e}")
+    return {"previous": previous, "hashes": {}, "written": [], "unchanged": []}
+
+
+def _save_manifest(manifest: dict):
+    """Save the run manifest; hashes of files not touched this run are carried over."""
+    hashes = {**manifest["previous"], **manifest["hashes"]}
+    data = {"written": manifest["written"], "unchanged": manifest["unchanged"], "hashes": hashes}
+    tmp = CONTENT_MANIFEST_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, CONTENT_MANIFEST_PATH)
+    logger.info(
+        f"Content manifest: {len(manifest['written'])} files written, "
+        f"{len(manifest['unchanged'])} unchanged"
     )
@@ -0,0 +1,164 @@
+"""Duplicate article detection: canonical URLs plus SimHash near-duplicate matching.
+
+The same story often arrives through several feeds (reposts, aggregators,
+mirrors). Posts are added to a Deduper one at a time. Each cluster is
+represented by its earliest post (by `date_of`, or the first added without
+it); an earlier-dated copy arriving later replaces the representative. The
+other copies are recorded as its alternate sources, so only the
+representative is summarized and shown.
+"""
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from pipeline.config import DEDUP_MAX_DISTANCE, DEDUP_MIN_TOKENS
+from pipeline.html_text import post_text
+from pipeline.search_index import tokenize
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_hsenc", "_hsmi", "mkt_tok", "ref", "ref_src", "spm", "share", "from",
+}
+TEXT_LIMIT = 3000  # Characters of text fingerprinted per post
+
+
+def canonical_url(url: str) -> str:
+    """URL identity key: no scheme, www., fragment, trailing slash or tracking params; sorted query."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return f"{host}{path}?{urlencode(query)}" if query else f"{host}{path}"
+
+
+def simhash(tokens: list[str]) -> int:
+    """64-bit SimHash over token bigram shingles."""
+    shingles = {f"{a} {b}" for a, b in zip(tokens, tokens[1:])} or set(tokens)
+    bits = [
+        format(int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big"), "064b")
+        for s in shingles
+    ]
+    # Column-wise majority vote over the feature hashes' bits
+    half = len(bits) / 2
+    return int("".join("1" if col.count("1") > half else "0" for col in zip(*bits)), 2)
+
+
+def _post_tokens(post: dict) -> list[str]:
+    return tokenize(f"{post.get('title', '')} {post_text(post)[:TEXT_LIMIT]}")
+
+
+def _band_masks(bands: int) -> list[tuple[int, int]]:
+    """(shift, mask) pairs splitting 64 bits into `bands` nearly equal slices."""
+    edges = [round(64 * i / bands) for i in range(bands + 1)]
+    return [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:])]
+
+
+class Deduper:
+    """Incremental duplicate clustering; each cluster is represented by its earliest post.
+
+    Posts match on canonical URL, or on SimHash distance <= max_distance when
+    they come from different feeds (posts of one feed are never reposts of
+    each other, and templated feeds such as release notes look alike).
+    Fingerprints are indexed in max_distance + 1 bands: two hashes within
+    that distance agree exactly on at least one band.
+
+    `date_of(post)` orders a cluster's posts; a duplicate that sorts before the
+    representative replaces it, so the result doesn't depend on arrival order.
+    Without it, the first post added represents its cluster.
+    """
+
+    def __init__(self, max_distance: int = DEDUP_MAX_DISTANCE, date_of=None):
+        self.max_distance = max_distance
+        self.date_of = date_of
+        self.band_masks = _band_masks(max_distance + 1)
+        self.reps: list[dict] = []  # cluster id → representative post
+        self.by_url: dict[str, int] = {}  # canonical url → cluster id
+        self.bands: list[dict[int, list[tuple[int, str, int]]]] = [{} for _ in self.band_masks]
+        self.alternates: dict[str, list[dict]] = {}  # representative url → other sources
+        self.duplicates = 0
+
+    def add(self, post: dict) -> dict | None:
+        """Add a post.
+
+        Returns None if it starts a new cluster, otherwise the post that is now a
+        duplicate: `post` itself, or the later representative it replaced.
+        """
+        key = canonical_url(post["url"])
+        cluster = self.by_url.get(key)
+
+        fingerprint = None
+        if cluster is None:
+            tokens = _post_tokens(post)
+            if len(tokens) >= DEDUP_MIN_TOKENS:
+                fingerprint = simhash(tokens)
+                cluster = self._nearest(fingerprint, post.get("feed_url", ""))
+
+        if cluster is None:
+            cluster = len(self.reps)
+            self.reps.append(post)
+            self.by_url[key] = cluster
+            self._index(fingerprint, post, cluster)
+            return None
+
+        self.duplicates += 1
+        self.by_url.setdefault(key, cluster)
+        rep = self.reps[cluster]
+        if self.date_of is not None and self.date_of(post) < self.date_of(rep):
+            self.reps[cluster] = post
+            self._index(fingerprint, post, cluster)
+            others = [a for a in self.alternates.pop(rep["url"], []) if canonical_url(a["url"]) != key]
+            if others:
+                self.alternates[post["url"]] = others
+            self._add_alternate(post, rep)
+            return rep
+        self._add_alternate(rep, post)
+        return post
+
+    def is_representative(self, post: dict) -> bool:
+        """True if `post` currently represents its cluster."""
+        cluster = self.by_url.get(canonical_url(post["url"]))
+        return cluster is not None and self.reps[cluster] is post
+
+    def _add_alternate(self, rep: dict, post: dict):
+        if canonical_url(post["url"]) != canonical_url(rep["url"]):
+            self.alternates.setdefault(rep["url"], []).append({
+                "title": post.get("title", ""),
+                "url": post["url"],
+                "feed_title": post.get("feed_title", ""),
+            })
+
+    def _index(self, fingerprint: int | None, post: dict, cluster: int):
+        if fingerprint is None:
+            return
+        entry = (fingerprint, post.get("feed_url", ""), cluster)
+        for band, (shift, mask) in zip(self.bands, self.band_masks):
+            band.setdefault((fingerprint >> shift) & mask, []).append(entry)
+
+    def _nearest(self, fingerprint: int, feed_url: str) -> int | None:
+        for band, (shift, mask) in zip(self.bands, self.band_masks):
+            for other, other_feed, cluster in band.get((fingerprint >> shift) & mask, []):
+                if (
+                    (fingerprint ^ other).bit_count() <= self.max_distance
+                    and (not feed_url or other_feed != feed_url)
+                ):
+                    return cluster
+        return None
+
+
+def dedupe_posts(posts: list[dict], date_of=None) -> tuple[list[dict], Deduper]:
+    """Keep one representative per duplicate cluster, preserving order.
+
+    Without `date_of` the first post of a cluster represents it, so callers
+    wanting the earliest publication sort first.
+    """
+    deduper = Deduper(date_of=date_of)
+    for post in posts:
+        deduper.add(post)
+    kept = [post for post in posts if deduper.is_representative(post)]
+    return kept, deduper
@@ -0,0 +1,86 @@
+"""Persistent feed cache for conditional GET (ETag / Last-Modified / body hash)."""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone, timedelta
+
+from pipeline.config import FEED_CACHE_ENABLED, FEED_CACHE_PATH, FEED_CACHE_MAX_AGE_DAYS
+
+logger = logging.getLogger(__name__)
+
+
+def load_feed_cache() -> dict | None:
+    """Load the feed cache from disk.
+
+    Returns:
+        Dict mapping xml_url to {etag, last_modified, body_hash, fetched_at, posts},
+        or None if caching is disabled.
+    """
+    if not FEED_CACHE_ENABLED:
+        return None
+    if not FEED_CACHE_PATH.exists():
+        return {}
+    try:
+        return json.loads(FEED_CACHE_PATH.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable feed cache {FEED_CACHE_PATH}: {e}")
+        return {}
+
+
+def save_feed_cache(cache: dict | None):
+    """Write the feed cache back to disk, dropping entries not fetched recently."""
+    if cache is None:
+        return
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=FEED_CACHE_MAX_AGE_DAYS)).isoformat()
+    kept = {url: e for url, e in cache.items() if e.get("fetched_at", "") >= cutoff}
+    tmp = FEED_CACHE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(kept, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(FEED_CACHE_PATH)
+    logger.info(f"Saved feed cache: {len(kept)} feeds ({len(cache) - len(kept)} expired)")
+
+
+def conditional_headers(entry: dict | None) -> dict:
+    """Build If-None-Match / If-Modified-Since headers from a cache entry."""
+    headers = {}
+    if not entry:
+        return headers
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def body_hash(body: bytes) -> str:
+    """Hash a raw response body to detect unchanged feeds without parsing."""
+    return hashlib.sha256(body).hexdigest()
+
+
+def make_entry(resp_headers, digest: str, posts: list[dict]) -> dict:
+    """Build a cache entry from response headers, body hash and parsed posts."""
+    return {
+        "etag": resp_headers.get("etag", ""),
+        "last_modified": resp_headers.get("last-modified", ""),
+        "body_hash": digest,
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "posts": posts,
+    }
+
+
+def refresh_entry(entry: dict, resp_headers) -> dict:
+    """Mark a cache entry as freshly validated, adopting any new validators."""
+    return {
+        **entry,
+        "etag": resp_headers.get("etag") or entry.get("etag", ""),
+        "last_modified": resp_headers.get("last-modified") or entry.get("last_modified", ""),
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def cached_posts(entry: dict, feed_title: str, category: str) -> list[dict]:
+    """Return a cache entry's posts, re-stamped with the feed's current OPML metadata."""
+    return [
+        {**p, "feed_title": feed_title, "category": category}
+        for p in entry.get("posts", [])
+    ]
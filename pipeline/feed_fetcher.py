@@ -2,89 +2,259 @@
 
 import asyncio
 import logging
+import time
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timezone
 from time import mktime
+from urllib.parse import urlsplit
 
 import feedparser
 import httpx
 
-from pipeline.config import FETCHER_MAX_CONCURRENT, FETCHER_TIMEOUT
+from pipeline.config import (
+    FETCHER_MAX_CONCURRENT, FETCHER_TIMEOUT, FETCHER_MAX_PER_HOST,
+    FETCHER_KEEPALIVE, FETCHER_HTTP2, FETCHER_PARSE_MODE, FETCHER_PARSE_WORKERS,
+)
+from pipeline.feed_cache import (
+    load_feed_cache, save_feed_cache, conditional_headers, body_hash,
+    make_entry, refresh_entry, cached_posts,
+)
+from pipeline.feed_health import (
+    load_feed_health, save_feed_health, feed_timeout, backed_off,
+    record_success, record_failure, unhealthy_hosts, HostLimiter,
+)
+from pipeline.feed_schedule import feed_hints, update_schedule, is_due
+from pipeline.html_text import html_to_text, count_words
+from pipeline.metrics import get_run_metrics
 
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "XinQiDong/1.0 RSS Aggregator"
+OK_STATUSES = {"ok", "not_modified", "unchanged"}
+SKIP_STATUSES = {"not_due", "backoff"}
 
-async def fetch_all_feeds(feeds: list[dict]) -> list[dict]:
+_parse_executor: Executor | None = None
+
+
+def _get_parse_executor() -> Executor | None:
+    """Lazily create the executor used for feed parsing (None means parse inline)."""
+    global _parse_executor
+    if _parse_executor is None and FETCHER_PARSE_MODE != "inline":
+        workers = max(1, FETCHER_PARSE_WORKERS)
+        if FETCHER_PARSE_MODE == "thread":
+            _parse_executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            _parse_executor = ProcessPoolExecutor(max_workers=workers)
+    return _parse_executor
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP client shared by every feed fetch in a run.
+
+    HTTP/2 is enabled when FETCHER_HTTP2 is set and the h2 package is installed.
+    """
+    http2 = FETCHER_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.info("h2 package not installed, using HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(
+        timeout=FETCHER_TIMEOUT,
+        follow_redirects=True,
+        http2=http2,
+        headers={"User-Agent": USER_AGENT},
+        limits=httpx.Limits(
+            max_connections=FETCHER_MAX_CONCURRENT,
+            max_keepalive_connections=FETCHER_KEEPALIVE,
+        ),
+    )
+
+
+async def fetch_all_feeds(
+    feeds: list[dict], client: httpx.AsyncClient | None = None, on_posts=None
+) -> list[dict]:
     """Fetch all feeds concurrently and return a flat list of posts.
 
     Args:
         feeds: List of feed dicts from OPML parser, each with
                'title', 'xml_url', 'html_url', 'category'.
+        client: Shared HTTP client. If omitted, one is created for this call.
+        on_posts: Optional callback receiving each feed's posts as soon as
+                  that feed finishes (used by the streaming pipeline).
 
     Returns:
-        List of post dicts with keys: title, url, author, published_at,
-        content, word_count, feed_title, feed_url, category.
+        List of post dicts with keys: title, url, guid, author, published_at,
+        content (HTML), text (plain), word_count, feed_title, feed_url, category.
     """
     if not feeds:
         return []
 
+    if client is None:
+        async with create_http_client() as own_client:
+            return await fetch_all_feeds(feeds, own_client, on_posts)
+
+    cache = load_feed_cache()
+    health = load_feed_health()
     semaphore = asyncio.Semaphore(FETCHER_MAX_CONCURRENT)
-    results = await asyncio.gather(
-        *[_fetch_single(feed, semaphore) for feed in feeds],
-        return_exceptions=True,
-    )
+    slow_hosts = unhealthy_hosts(health, _host)
+    host_limiters: dict[str, HostLimiter] = {}
 
-    all_posts = []
-    success = 0
-    failed = 0
-    for r in results:
-        if isinstance(r, list):
-            all_posts.extend(r)
-            success += 1
-        else:
-            failed += 1
-            if isinstance(r, Exception):
-                logger.debug(f"Feed fetch exception: {r}")
+    async def fetch_one(feed: dict) -> tuple[str, list[dict]]:
+        host = _host(feed["xml_url"])
+        if host not in host_limiters:
+            host_limiters[host] = HostLimiter(1 if host in slow_hosts else FETCHER_MAX_PER_HOST)
+        status, posts = await _fetch_single(feed, semaphore, cache, health, client, host_limiters[host])
+        if on_posts and posts:
+            on_posts(posts)
+        return status, posts
+
+    results = await asyncio.gather(*[fetch_one(feed) for feed in feeds])
+    save_feed_cache(cache)
+    save_feed_health(health)
+
+    all_posts = [post for _, posts in results for post in posts]
+    statuses = Counter(status for status, _ in results)
 
+    skipped = sum(statuses[status] for status in SKIP_STATUSES)
+    failed = sum(n for status, n in statuses.items() if status not in OK_STATUSES | SKIP_STATUSES)
     logger.info(
-        f"Fetched {success}/{len(feeds)} feeds, "
-        f"got {len(all_posts)} posts, {failed} failed"
+        f"Fetched {len(feeds) - failed - skipped}/{len(feeds)} feeds, "
+        f"got {len(all_posts)} posts, {failed} failed, "
+        f"{statuses['not_due']} not due, {statuses['backoff']} skipped (backoff)"
     )
     return all_posts
 
 
-async def _fetch_single(feed: dict, semaphore: asyncio.Semaphore) -> list[dict]:
-    """Fetch a single feed and return list of post dicts."""
-    async with semaphore:
-        xml_url = feed["xml_url"]
-        feed_title = feed.get("title", "")
-        category = feed.get("category", "")
-        headers = {"User-Agent": "XinQiDong/1.0 RSS Aggregator"}
+def _host(url: str) -> str:
+    return urlsplit(url).hostname or ""
 
-        try:
-            async with httpx.AsyncClient(
-                timeout=FETCHER_TIMEOUT, follow_redirects=True
-            ) as client:
-                resp = await client.get(xml_url, headers=headers)
 
-            if resp.status_code != 200:
-                logger.debug(f"HTTP {resp.status_code} for {xml_url}")
-                return []
+async def _fetch_single(
+    feed: dict,
+    semaphore: asyncio.Semaphore,
+    cache: dict | None,
+    health: dict,
+    client: httpx.AsyncClient,
+    host_limiter: HostLimiter,
+) -> tuple[str, list[dict]]:
+    """Fetch a single feed. Returns (status, posts); failures are recorded, not raised.
+
+    When a cache is given, sends conditional headers from the previous fetch
+    and returns the cached posts without parsing on 304 or an unchanged body.
+    Feeds in their failure backoff window are skipped without a request, and
+    feeds not yet due for polling (see feed_schedule) return their cached posts.
+    """
+    xml_url = feed["xml_url"]
+    feed_title = feed.get("title", "")
+    category = feed.get("category", "")
+    cached = cache.get(xml_url) if cache is not None else None
+    headers = conditional_headers(cached)
+    record = health.get(xml_url)
+    metrics = get_run_metrics()
+    timing: dict = {}
+
+    def finish(status: str, result: list[dict], **fields) -> tuple[str, list[dict]]:
+        metrics.record_feed(xml_url, status, **timing, **fields)
+        return status, result
+
+    if backed_off(record):
+        logger.debug(f"Backing off {xml_url} until {record['retry_after']}")
+        return finish("backoff", [], failures=record.get("failures", 0))
+
+    # Not due yet: serve the last fetched posts without a request
+    if cached and not is_due(record):
+        return finish("not_due", cached_posts(cached, feed_title, category))
+
+    try:
+        # Only the download holds a connection slot; parsing happens after release
+        queued = time.monotonic()
+        async with host_limiter, semaphore:
+            started = time.monotonic()
+            timing["wait_s"] = round(started - queued, 3)
+            try:
+                resp = await client.get(xml_url, headers=headers, timeout=feed_timeout(record))
+            except httpx.TransportError:
+                host_limiter.failure()
+                raise
+            latency = time.monotonic() - started
+            timing["latency_s"] = round(latency, 3)
+            if resp.status_code == 429 or resp.status_code >= 500:
+                host_limiter.failure()
+            else:
+                host_limiter.success()
+        timing["bytes"] = len(resp.content)
+
+        if resp.status_code == 304 and cached:
+            logger.debug(f"Not modified: {xml_url}")
+            cache[xml_url] = refresh_entry(cached, resp.headers)
+            record_success(health, xml_url, latency)
+            update_schedule(health[xml_url], cached["posts"], resp.headers)
+            return finish("not_modified", cached_posts(cached, feed_title, category))
+
+        if resp.status_code != 200:
+            logger.debug(f"HTTP {resp.status_code} for {xml_url}")
+            record_failure(health, xml_url, f"HTTP {resp.status_code}")
+            return finish(f"http_{resp.status_code}", [])
 
-            parsed = feedparser.parse(resp.text)
-            if parsed.bozo and not parsed.entries:
-                logger.debug(f"Parse error for {xml_url}")
-                return []
+        digest = body_hash(resp.content)
+        if cached and cached.get("body_hash") == digest:
+            logger.debug(f"Unchanged body: {xml_url}")
+            cache[xml_url] = refresh_entry(cached, resp.headers)
+            record_success(health, xml_url, latency)
+            update_schedule(health[xml_url], cached["posts"], resp.headers)
+            return finish("unchanged", cached_posts(cached, feed_title, category))
 
-            posts = []
-            for entry in parsed.entries:
-                post = _parse_entry(entry, feed_title, xml_url, category)
-                if post:
-                    posts.append(post)
-            return posts
+        parse_start = time.monotonic()
+        executor = _get_parse_executor()
+        if executor is None:
+            parsed = _parse_feed(resp.text, feed_title, xml_url, category)
+        else:
+            parsed = await asyncio.get_running_loop().run_in_executor(
+                executor, _parse_feed, resp.text, feed_title, xml_url, category
+            )
+        timing["parse_s"] = round(time.monotonic() - parse_start, 3)
+        if parsed is None:
+            logger.debug(f"Parse error for {xml_url}")
+            record_failure(health, xml_url, "parse error")
+            return finish("parse_error", [])
+
+        posts, hints = parsed
+        if cache is not None:
+            cache[xml_url] = make_entry(resp.headers, digest, posts)
+        record_success(health, xml_url, latency)
+        update_schedule(health[xml_url], posts, resp.headers, hints)
+        return finish("ok", posts, posts=len(posts))
+
+    except Exception as e:
+        record_failure(health, xml_url, type(e).__name__)
+        logger.warning(
+            f"Failed to fetch {xml_url} ({health[xml_url]['failures']} in a row): "
+            f"{type(e).__name__}: {e}"
+        )
+        return finish("error", [], error=type(e).__name__)
+
+
+def _parse_feed(
+    text: str, feed_title: str, feed_url: str, category: str
+) -> tuple[list[dict], dict] | None:
+    """Parse a feed body into (post dicts, polling hints). Returns None if the feed is unparseable.
+
+    Runs in the parse executor, so it must stay a picklable module-level function.
+    """
+    parsed = feedparser.parse(text)
+    if parsed.bozo and not parsed.entries:
+        return None
 
-        except Exception as e:
-            logger.warning(f"Failed to fetch {xml_url}: {e}")
-            raise
+    posts = []
+    for entry in parsed.entries:
+        post = _parse_entry(entry, feed_title, feed_url, category)
+        if post:
+            posts.append(post)
+    return posts, feed_hints(parsed.feed)
 
 
 def _parse_entry(entry, feed_title: str, feed_url: str, category: str) -> dict | None:
@@ -114,15 +284,17 @@ def _parse_entry(entry, feed_title: str, feed_url: str, category: str) -> dict |
     elif entry.get("description"):
         content = entry.description
 
-    word_count = len(content.split()) if content else 0
+    text = html_to_text(content)
 
     return {
         "title": title,
         "url": url,
+        "guid": entry.get("id", ""),
         "author": author,
         "published_at": published_at,
         "content": content,
-        "word_count": word_count,
+        "text": text,
+        "word_count": count_words(text),
         "feed_title": feed_title,
         "feed_url": feed_url,
         "category": category,
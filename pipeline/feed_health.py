@@ -0,0 +1,128 @@
+"""Persistent per-feed health records and adaptive per-host concurrency.
+
+Each feed URL keeps a latency EWMA (successful fetches only), a failure
+streak, and its last success. These size per-request timeouts, back off
+chronically failing feeds over several runs, and set each host's starting
+concurrency. Within a run, HostLimiter adjusts a host's concurrency AIMD-style.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone, timedelta
+
+from pipeline.config import (
+    FEED_HEALTH_PATH, FEED_CACHE_MAX_AGE_DAYS, FETCHER_TIMEOUT, FETCHER_MIN_TIMEOUT,
+    FETCHER_TIMEOUT_FACTOR, FETCHER_MAX_PER_HOST,
+    FEED_BACKOFF_AFTER, FEED_BACKOFF_BASE_HOURS, FEED_BACKOFF_MAX_HOURS,
+)
+
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.3
+
+
+def load_feed_health() -> dict:
+    """Load health records: xml_url → {latency_ewma, failures, last_success, last_attempt, retry_after, last_error}."""
+    if not FEED_HEALTH_PATH.exists():
+        return {}
+    try:
+        return json.loads(FEED_HEALTH_PATH.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable feed health {FEED_HEALTH_PATH}: {e}")
+        return {}
+
+
+def save_feed_health(health: dict):
+    """Write health records back to disk, dropping feeds not attempted recently."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=FEED_CACHE_MAX_AGE_DAYS)).isoformat()
+    kept = {url: r for url, r in health.items() if r.get("last_attempt", "") >= cutoff}
+    tmp = FEED_HEALTH_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(kept, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+    tmp.replace(FEED_HEALTH_PATH)
+    failing = sum(1 for r in kept.values() if r.get("failures"))
+    logger.info(f"Saved feed health: {len(kept)} feeds, {failing} currently failing")
+
+
+def feed_timeout(record: dict | None) -> float:
+    """Per-request timeout sized from the feed's observed latency.
+
+    Feeds without a latency history get FETCHER_TIMEOUT, or FETCHER_MIN_TIMEOUT
+    once they have started failing, so dead feeds stop costing a full timeout.
+    """
+    if not record:
+        return FETCHER_TIMEOUT
+    ewma = record.get("latency_ewma")
+    if ewma is None:
+        return FETCHER_MIN_TIMEOUT if record.get("failures") else FETCHER_TIMEOUT
+    return min(FETCHER_TIMEOUT, max(FETCHER_MIN_TIMEOUT, FETCHER_TIMEOUT_FACTOR * ewma))
+
+
+def backed_off(record: dict | None) -> bool:
+    """True while a failing feed is inside its backoff window and should be skipped."""
+    if not record or not record.get("retry_after"):
+        return False
+    return datetime.now(timezone.utc).isoformat() < record["retry_after"]
+
+
+def record_success(health: dict, url: str, latency: float):
+    now = datetime.now(timezone.utc).isoformat()
+    record = health.setdefault(url, {})
+    ewma = record.get("latency_ewma")
+    record["latency_ewma"] = round(latency if ewma is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * ewma, 3)
+    record["failures"] = 0
+    record["last_success"] = now
+    record["last_attempt"] = now
+    record.pop("retry_after", None)
+    record.pop("last_error", None)
+
+
+def record_failure(health: dict, url: str, error: str):
+    """Extend the failure streak; from FEED_BACKOFF_AFTER failures, back off exponentially."""
+    now = datetime.now(timezone.utc)
+    record = health.setdefault(url, {})
+    record["failures"] = record.get("failures", 0) + 1
+    record["last_attempt"] = now.isoformat()
+    record["last_error"] = error
+    if record["failures"] >= FEED_BACKOFF_AFTER:
+        hours = min(
+            FEED_BACKOFF_BASE_HOURS * 2 ** (record["failures"] - FEED_BACKOFF_AFTER),
+            FEED_BACKOFF_MAX_HOURS,
+        )
+        record["retry_after"] = (now + timedelta(hours=hours)).isoformat()
+
+
+def unhealthy_hosts(health: dict, host_of) -> set[str]:
+    """Hosts where most known feeds are currently failing; they start at one connection."""
+    totals: dict[str, list[int]] = {}
+    for url, record in health.items():
+        counts = totals.setdefault(host_of(url), [0, 0])
+        counts[0] += 1
+        counts[1] += bool(record.get("failures"))
+    return {host for host, (total, failing) in totals.items() if failing * 2 > total}
+
+
+class HostLimiter:
+    """Concurrency limit for one host: halves on overload/failure, grows by ~1 per `limit` successes."""
+
+    def __init__(self, initial: int, maximum: int = FETCHER_MAX_PER_HOST):
+        self.maximum = max(1, maximum)
+        self.limit = float(min(max(1, initial), self.maximum))
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def success(self):
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def failure(self):
+        self.limit = max(1.0, self.limit / 2)
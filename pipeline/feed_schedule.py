@@ -0,0 +1,102 @@
+"""Per-feed polling schedule from observed publish cadence and publisher hints.
+
+The poll interval is a fraction of the feed's typical gap between entries,
+never shorter than what the publisher asks for (RSS <ttl>, sy:updatePeriod /
+sy:updateFrequency, HTTP Cache-Control max-age), and clamped to
+[FEED_POLL_MIN_MINUTES, FEED_POLL_MAX_HOURS]. The schedule lives in the feed's
+health record (feed_health.json).
+"""
+
+import re
+from datetime import datetime, timezone
+from statistics import median
+
+from pipeline.config import (
+    FEED_SCHEDULER_ENABLED, FEED_POLL_MIN_MINUTES, FEED_POLL_MAX_HOURS, FEED_POLL_CADENCE_FACTOR,
+)
+
+CADENCE_SAMPLE = 10  # Newest dated entries used to estimate the publish gap
+EARLY_FRACTION = 0.1  # A feed is due slightly early, so runs on a fixed cron don't miss it
+
+SY_PERIOD_SECONDS = {
+    "hourly": 3600,
+    "daily": 86400,
+    "weekly": 7 * 86400,
+    "monthly": 30 * 86400,
+    "yearly": 365 * 86400,
+}
+
+_MAX_AGE_RE = re.compile(r"(?:s-)?max-age\s*=\s*(\d+)")
+
+
+def feed_hints(feed_info) -> dict:
+    """Publisher polling hints from feedparser's parsed.feed, in seconds."""
+    hints = {}
+    try:
+        ttl = int(feed_info.get("ttl") or 0)
+        if ttl > 0:
+            hints["ttl_s"] = ttl * 60
+    except (TypeError, ValueError):
+        pass
+
+    period = SY_PERIOD_SECONDS.get((feed_info.get("sy_updateperiod") or "").strip().lower())
+    if period:
+        try:
+            frequency = max(1, int(feed_info.get("sy_updatefrequency") or 1))
+        except (TypeError, ValueError):
+            frequency = 1
+        hints["update_period_s"] = period // frequency
+    return hints
+
+
+def cache_max_age(resp_headers) -> int | None:
+    """Freshness lifetime from Cache-Control (0 for no-cache/no-store)."""
+    value = (resp_headers.get("cache-control") or "").lower()
+    if not value:
+        return None
+    if "no-cache" in value or "no-store" in value:
+        return 0
+    match = _MAX_AGE_RE.search(value)
+    return int(match.group(1)) if match else None
+
+
+def publish_gap(posts: list[dict], now: datetime) -> float | None:
+    """Typical seconds between entries: the median recent gap, or longer if the feed has gone quiet."""
+    times = []
+    for post in posts:
+        try:
+            times.append(datetime.fromisoformat(post["published_at"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    if not times:
+        return None
+    times = sorted(times, reverse=True)[:CADENCE_SAMPLE]
+    since_newest = max(0.0, (now - times[0]).total_seconds())
+    if len(times) < 2:
+        return since_newest or None
+    gaps = [(a - b).total_seconds() for a, b in zip(times, times[1:])]
+    return max(median(gaps), since_newest)
+
+
+def update_schedule(record: dict, posts: list[dict], resp_headers, hints: dict | None = None):
+    """Record a successful poll and compute the feed's next poll interval."""
+    now = datetime.now(timezone.utc)
+    if hints is not None:
+        record["hints"] = hints
+
+    gap = publish_gap(posts, now)
+    interval = gap * FEED_POLL_CADENCE_FACTOR if gap else 0
+    publisher = [*record.get("hints", {}).values(), cache_max_age(resp_headers) or 0]
+    interval = max(interval, *publisher)
+    interval = min(max(interval, FEED_POLL_MIN_MINUTES * 60), FEED_POLL_MAX_HOURS * 3600)
+
+    record["last_poll"] = now.isoformat()
+    record["poll_interval_s"] = int(interval)
+
+
+def is_due(record: dict | None) -> bool:
+    """True if the feed should be requested this run."""
+    if not FEED_SCHEDULER_ENABLED or not record or not record.get("last_poll"):
+        return True
+    elapsed = (datetime.now(timezone.utc) - datetime.fromisoformat(record["last_poll"])).total_seconds()
+    return elapsed >= record.get("poll_interval_s", 0) * (1 - EARLY_FRACTION)
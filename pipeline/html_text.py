@@ -0,0 +1,59 @@
+"""Fast HTML-to-text for feed content: drops markup and boilerplate, keeps headings and paragraphs.
+
+The plain text feeds prompts, dedup and word counts; the original HTML is
+kept in post["content"] for display.
+"""
+
+import re
+from html import unescape
+
+_DROP_BLOCKS_RE = re.compile(
+    r"<(script|style|noscript|svg|iframe|object|form|nav|footer|aside|button|select)\b.*?</\1\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_BLOCK_TAG_RE = re.compile(
+    r"</?(?:p|div|br|hr|li|ul|ol|h[1-6]|tr|table|blockquote|pre|section|article|header|figcaption|dd|dt)\b[^>]*>",
+    re.IGNORECASE,
+)
+_TAG_RE = re.compile(r"<[A-Za-z/!?][^>]*>")  # Only tag-like markup; a bare "<" in text stays
+_SPACE_RE = re.compile(r"[ \t\r\f\v 　]+")
+_BOILERPLATE_RE = re.compile(
+    r"^(?:the post .* appeared first on .*|continue reading.*|read more.*|read the full .*"
+    r"|share this:?.*|related posts?:?|阅读全文.*|查看原文.*|点击阅读原文.*)$",
+    re.IGNORECASE,
+)
+_WORD_RE = re.compile(r"[A-Za-z0-9]+(?:['’][A-Za-z]+)*|[㐀-鿿豈-﫿]")
+
+
+def html_to_text(html: str) -> str:
+    """Plain text of an HTML fragment: one line per heading/paragraph/list item."""
+    if not html:
+        return ""
+    if "<" not in html:
+        text = unescape(html)
+    else:
+        text = _COMMENT_RE.sub("", html)
+        text = _DROP_BLOCKS_RE.sub(" ", text)
+        text = _BLOCK_TAG_RE.sub("\n", text)
+        text = unescape(_TAG_RE.sub("", text))
+
+    lines = []
+    for line in text.split("\n"):
+        line = _SPACE_RE.sub(" ", line).strip()
+        if line and not _BOILERPLATE_RE.match(line):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def count_words(text: str) -> int:
+    """Words in plain text; each CJK character counts as one word."""
+    return len(_WORD_RE.findall(text))
+
+
+def post_text(post: dict) -> str:
+    """A post's plain text, derived from its HTML if the post predates the "text" field."""
+    text = post.get("text")
+    if text is None:
+        text = html_to_text(post.get("content") or "")
+    return text
@@ -0,0 +1,143 @@
+"""Run instrumentation: stage timings, per-feed and per-LLM-call records, peak RSS.
+
+Everything is collected in one run-wide RunMetrics and written as a JSON
+report (RUN_REPORT_PATH) at the end of the run.
+"""
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from pipeline.config import RUN_REPORT_PATH
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_FEEDS = 20
+
+_metrics: "RunMetrics | None" = None
+
+
+class RunMetrics:
+    """Collects timings and resource usage for one pipeline run."""
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.monotonic()
+        self.stages: dict[str, float] = {}
+        self.feeds: list[dict] = []
+        self.llm_calls: list[dict] = []
+        self.users: list[dict] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a pipeline stage; repeated stages accumulate."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.monotonic() - start
+
+    def record_feed(self, url: str, status: str, **fields):
+        """Record one feed fetch (latency_s, wait_s, bytes, parse_s, posts)."""
+        self.feeds.append({"url": url, "status": status, **fields})
+
+    def record_llm_call(
+        self, kind: str, articles: int, latency_s: float, tokens: int, ok: bool, cached_tokens: int = 0,
+    ):
+        self.llm_calls.append({
+            "kind": kind,
+            "articles": articles,
+            "latency_s": round(latency_s, 3),
+            "tokens": tokens,
+            "cached_tokens": cached_tokens,
+            "ok": ok,
+        })
+
+    def record_user(self, user_id: str, articles: int, timings: dict[str, float]):
+        self.users.append({
+            "user": user_id[:8],
+            "articles": articles,
+            "timings_s": {name: round(secs, 3) for name, secs in timings.items()},
+        })
+
+    def report(self) -> dict:
+        feeds = sorted(self.feeds, key=lambda f: f.get("latency_s", 0), reverse=True)
+        statuses: dict[str, int] = {}
+        for feed in feeds:
+            statuses[feed["status"]] = statuses.get(feed["status"], 0) + 1
+        llm_by_kind: dict[str, dict] = {}
+        for call in self.llm_calls:
+            kind = llm_by_kind.setdefault(
+                call["kind"],
+                {"calls": 0, "failed": 0, "articles": 0, "tokens": 0, "cached_tokens": 0, "latency_s": 0.0},
+            )
+            kind["calls"] += 1
+            kind["failed"] += not call["ok"]
+            kind["articles"] += call["articles"]
+            kind["tokens"] += call["tokens"]
+            kind["cached_tokens"] += call["cached_tokens"]
+            kind["latency_s"] = round(kind["latency_s"] + call["latency_s"], 3)
+
+        return {
+            "started_at": self.started_at.isoformat(),
+            "wall_s": round(time.monotonic() - self.started, 3),
+            "stages_s": {name: round(secs, 3) for name, secs in self.stages.items()},
+            "resources": _resource_usage(),
+            "feeds": {
+                "count": len(feeds),
+                "statuses": statuses,
+                "bytes": sum(f.get("bytes", 0) for f in feeds),
+                "latency_s": round(sum(f.get("latency_s", 0) for f in feeds), 3),
+                "parse_s": round(sum(f.get("parse_s", 0) for f in feeds), 3),
+                "slowest": feeds[:SLOWEST_FEEDS],
+            },
+            "llm": llm_by_kind,
+            "llm_calls": self.llm_calls,
+            "users": self.users,
+            "feed_details": feeds,
+        }
+
+
+def _resource_usage() -> dict:
+    """Peak RSS of this process and of its (parse worker) children, in MiB."""
+    if resource is None:
+        return {}
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "peak_rss_mib": round(self_usage.ru_maxrss / scale, 1),
+        "children_peak_rss_mib": round(children.ru_maxrss / scale, 1),
+        "cpu_user_s": round(self_usage.ru_utime + children.ru_utime, 3),
+        "cpu_system_s": round(self_usage.ru_stime + children.ru_stime, 3),
+    }
+
+
+def get_run_metrics() -> RunMetrics:
+    """Return the run-wide metrics collector, creating it on first use."""
+    global _metrics
+    if _metrics is None:
+        _metrics = RunMetrics()
+    return _metrics
+
+
+def write_run_report(path=RUN_REPORT_PATH):
+    """Write the run report as JSON and log a one-line stage summary."""
+    report = get_run_metrics().report()
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    stages = ", ".join(f"{name} {secs:.1f}s" for name, secs in report["stages_s"].items())
+    logger.info(
+        f"Run report: {report['wall_s']:.1f}s [{stages}], "
+        f"peak RSS {report['resources'].get('peak_rss_mib', '?')} MiB → {path}"
+    )
@@ -0,0 +1,54 @@
+"""Token-per-minute rate limiting for concurrent LLM calls."""
+
+import asyncio
+import time
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate: ~1 token per CJK char, ~3 ASCII chars per token."""
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+class TokenRateLimiter:
+    """Token bucket holding up to `tokens_per_minute`, refilled continuously.
+
+    A limit of 0 disables limiting. Callers reserve an estimate before a
+    request and settle it once the real usage is known.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.available = float(tokens_per_minute)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(
+            self.capacity,
+            self.available + (now - self.updated) * self.capacity / 60,
+        )
+        self.updated = now
+
+    async def acquire(self, tokens: int):
+        """Wait until `tokens` (capped at the bucket size) can be spent."""
+        if self.capacity <= 0:
+            return
+        tokens = min(tokens, self.capacity)
+        async with self.lock:
+            self._refill()
+            while self.available < tokens:
+                await asyncio.sleep((tokens - self.available) * 60 / self.capacity)
+                self._refill()
+            self.available -= tokens
+
+    def settle(self, reserved: int, used: int):
+        """Correct a reservation once real usage is known.
+
+        Over-reservations are refunded; under-reservations are charged, which
+        may leave the bucket negative so later callers wait longer.
+        """
+        if self.capacity <= 0:
+            return
+        self._refill()
+        self.available = min(self.capacity, self.available + min(reserved, self.capacity) - used)
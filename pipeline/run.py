@@ -1,14 +1,27 @@
-"""Main pipeline entry point: fetch feeds → AI summarize → generate content."""
+"""Main pipeline entry point: fetch feeds → AI summarize → generate content.
 
+    python -m pipeline.run [all|fetch|summarize|generate] [--resume]
+
+`all` (default) runs every stage, checkpointing each one. `fetch`,
+`summarize` and `generate` run a single stage from the previous stage's
+checkpoint. `--resume` continues an interrupted run from where it stopped.
+"""
+
+import argparse
 import asyncio
 import logging
 import sys
+from datetime import date
 
-from pipeline.config import FEEDS_OPML
+from pipeline.config import FEEDS_OPML, PIPELINE_STREAMING, PIPELINE_PROFILE, RUN_REPORT_PATH
 from pipeline.opml_parser import parse_opml
-from pipeline.feed_fetcher import fetch_all_feeds
-from pipeline.ai_summarizer import summarize_articles
-from pipeline.content_generator import generate_content
+from pipeline.feed_fetcher import fetch_all_feeds, create_http_client
+from pipeline.ai_summarizer import summarize_articles, summarize_stream
+from pipeline.checkpoint import resumable_stages, save_stage, load_stage, complete_run
+from pipeline.content_generator import generate_content, write_article_contents
+from pipeline.metrics import get_run_metrics, write_run_report
+from pipeline.seen_entries import close_seen_index
+from pipeline.summary_cache import close_summary_cache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,7 +30,53 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def main():
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m pipeline.run", description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "command", nargs="?", default="all", choices=["all", "fetch", "summarize", "generate"],
+        help="stage to run: all (default), fetch only, summarize the fetched snapshot, or generate only",
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="skip stages an interrupted run already finished today",
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv: list[str] | None = None):
+    args = _parse_args(argv)
+    profiler = None
+    if PIPELINE_PROFILE:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        # One pooled HTTP client for the global and user feed fetches
+        async with create_http_client() as client:
+            try:
+                await _run(client, args.command, args.resume)
+            finally:
+                close_summary_cache()
+                close_seen_index()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profile_path = RUN_REPORT_PATH.with_suffix(".prof")
+            profiler.dump_stats(str(profile_path))
+            logger.info(f"cProfile stats written to {profile_path}")
+        write_run_report()
+
+
+def _require_checkpoint(stage: str):
+    data = load_stage(stage)
+    if data is None:
+        logger.error(f"No checkpoint from today's {stage} stage; run `python -m pipeline.run {stage}` first")
+        sys.exit(1)
+    return data
+
+
+async def _run(client, command: str = "all", resume: bool = False):
     # 1. Parse OPML
     logger.info(f"Parsing OPML: {FEEDS_OPML}")
     feeds = parse_opml(FEEDS_OPML)
@@ -27,37 +86,111 @@ async def main():
         logger.error("No feeds found in OPML file")
         sys.exit(1)
 
+    if command == "fetch":
+        await _fetch(feeds, client)
+        return
+    if command == "summarize":
+        await _summarize(_require_checkpoint("fetch")["posts"])
+        return
+    if command == "generate":
+        _generate(_require_checkpoint("summarize"), feeds)
+        return
+
+    done = resumable_stages() if resume else set()
+    if done:
+        logger.info(f"Resuming today's run after: {', '.join(sorted(done))}")
+    metrics = get_run_metrics()
+
+    if "summarize" in done:
+        articles_data = load_stage("summarize")
+    elif "fetch" in done:
+        articles_data = await _summarize(load_stage("fetch")["posts"])
+    elif PIPELINE_STREAMING:
+        # 2+3. Summarize batches while slower feeds are still downloading
+        logger.info("Fetching and summarizing feeds (streaming)...")
+        with metrics.stage("fetch_summarize"):
+            articles_data = await _fetch_and_summarize_streaming(feeds, client)
+        save_stage("summarize", articles_data)
+    else:
+        posts = await _fetch(feeds, client)
+        articles_data = await _summarize(posts)
+
+    # 4. Generate static content
+    if "generate" in done:
+        logger.info("Content already written by the interrupted run")
+    else:
+        _generate(articles_data, feeds)
+    logger.info("Done with global pipeline!")
+
+    # 5. Process user custom feeds (writes to Supabase, not static files)
+    try:
+        from pipeline.user_feeds import process_user_feeds
+        logger.info("Processing user custom feeds...")
+        with metrics.stage("user_feeds"):
+            await process_user_feeds(client)
+        logger.info("User feeds done!")
+    except Exception as e:
+        logger.error(f"User feeds processing failed (non-fatal): {e}")
+    complete_run()
+
+
+async def _fetch(feeds: list[dict], client) -> list[dict]:
     # 2. Fetch all feeds
     logger.info("Fetching feeds...")
-    posts = await fetch_all_feeds(feeds)
+    with get_run_metrics().stage("fetch"):
+        posts = await fetch_all_feeds(feeds, client)
     logger.info(f"Fetched {len(posts)} posts total")
-
     if not posts:
         logger.warning("No posts fetched, generating empty articles data")
+    save_stage("fetch", {"posts": posts})
+    return posts
+
 
+async def _summarize(posts: list[dict]) -> dict:
     # 3. AI summarize all recent articles
     logger.info("Summarizing articles...")
-    articles_data = summarize_articles(posts)
+    with get_run_metrics().stage("summarize"):
+        articles_data = await summarize_articles(posts)
     logger.info(
         f"Articles for {articles_data['date']}: "
         f"{articles_data['article_count']} articles, "
         f"{articles_data['tokens_used']} tokens used"
     )
+    save_stage("summarize", articles_data)
+    return articles_data
 
-    # 4. Generate static content
+
+def _generate(articles_data: dict, feeds: list[dict]):
     logger.info("Writing content files...")
-    generate_content(articles_data, feeds)
-    logger.info("Done with global pipeline!")
+    with get_run_metrics().stage("generate"):
+        generate_content(articles_data, feeds)
+    save_stage("generate")
 
-    # 5. Process user custom feeds (writes to Supabase, not static files)
-    try:
-        from pipeline.user_feeds import process_user_feeds
-        logger.info("Processing user custom feeds...")
-        await process_user_feeds()
-        logger.info("User feeds done!")
-    except Exception as e:
-        logger.error(f"User feeds processing failed (non-fatal): {e}")
 
+async def _fetch_and_summarize_streaming(feeds: list[dict], client) -> dict:
+    """Feed each finished feed's posts to the summarizer and write content per batch."""
+    queue: asyncio.Queue = asyncio.Queue()
+    articles_date = date.today().isoformat()
+
+    async def fetch():
+        try:
+            posts = await fetch_all_feeds(feeds, client, on_posts=queue.put_nowait)
+            logger.info(f"Fetched {len(posts)} posts total")
+            save_stage("fetch", {"posts": posts})
+        finally:
+            queue.put_nowait(None)
+
+    fetch_task = asyncio.create_task(fetch())
+    articles_data = await summarize_stream(
+        queue, on_batch=lambda articles: write_article_contents(articles_date, articles)
+    )
+    await fetch_task
+    logger.info(
+        f"Articles for {articles_data['date']}: "
+        f"{articles_data['article_count']} articles, "
+        f"{articles_data['tokens_used']} tokens used"
+    )
+    return articles_data
 
 
 if __name__ == "__main__":
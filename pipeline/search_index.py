@@ -0,0 +1,105 @@
+"""Inverted search index over the article archive, served by /api/search.
+
+Index layout (site/content/search-index.json):
+  - docs:     [{id, date, title, url, feed_title, author, summary_zh, tags}], newest date first
+  - postings: {term: [doc number, ...]} in doc order
+
+Terms are lowercase ASCII words plus CJK bigrams (single CJK characters when
+a run is one character long). site/app/api/search/route.ts must tokenize
+queries the same way.
+"""
+
+import json
+import logging
+import re
+
+from pipeline.config import ARTICLES_DIR, SEARCH_INDEX_PATH
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+SEARCH_FIELDS = ("title", "summary_zh", "feed_title", "author")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[㐀-鿿豈-﫿]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into ASCII word tokens and CJK bigrams."""
+    tokens = []
+    for run in _TOKEN_RE.findall(text.lower()):
+        if run[0].isascii():
+            if len(run) >= 2:
+                tokens.append(run)
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _doc_terms(doc: dict) -> set[str]:
+    terms = set()
+    for field in SEARCH_FIELDS:
+        terms.update(tokenize(doc.get(field) or ""))
+    for tag in doc.get("tags", []):
+        terms.update(tokenize(tag))
+    return terms
+
+
+def _make_doc(article: dict, articles_date: str) -> dict:
+    return {
+        "id": article["id"],
+        "date": articles_date,
+        "title": article.get("title", ""),
+        "url": article.get("url", ""),
+        "feed_title": article.get("feed_title", ""),
+        "author": article.get("author", ""),
+        "summary_zh": article.get("summary_zh", ""),
+        "tags": article.get("tags", []),
+    }
+
+
+def _load_docs() -> list[dict]:
+    """Docs from the existing index, or rebuilt from the whole archive on first use."""
+    if SEARCH_INDEX_PATH.exists():
+        try:
+            data = json.loads(SEARCH_INDEX_PATH.read_text(encoding="utf-8"))
+            if data.get("version") == INDEX_VERSION:
+                return data["docs"]
+        except Exception as e:
+            logger.warning(f"Rebuilding unreadable search index: {e}")
+
+    docs = []
+    for path in sorted(ARTICLES_DIR.glob("????-??-??.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        docs.extend(_make_doc(a, path.stem) for a in data.get("articles", []))
+    logger.info(f"Built search index docs from archive: {len(docs)} docs")
+    return docs
+
+
+def build_search_index(articles_date: str, articles: list[dict]) -> dict:
+    """Replace `articles_date`'s docs in the index and recompute postings.
+
+    Args:
+        articles_date: Date of the articles being written (YYYY-MM-DD).
+        articles: That date's article list entries.
+
+    Returns:
+        The index data, ready to be written to SEARCH_INDEX_PATH.
+    """
+    docs = [d for d in _load_docs() if d["date"] != articles_date]
+    docs.extend(_make_doc(a, articles_date) for a in articles)
+    # Newest first; stable sort keeps each day's article order
+    docs.sort(key=lambda d: d["date"], reverse=True)
+
+    postings: dict[str, list[int]] = {}
+    for n, doc in enumerate(docs):
+        for term in _doc_terms(doc):
+            postings.setdefault(term, []).append(n)
+
+    logger.info(f"Search index: {len(docs)} docs, {len(postings)} terms")
+    return {
+        "version": INDEX_VERSION,
+        "docs": docs,
+        "postings": dict(sorted(postings.items())),
+    }
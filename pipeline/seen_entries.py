@@ -0,0 +1,128 @@
+"""Persistent seen-entry index (SQLite): when each feed entry was first seen, and its last summary.
+
+Entries are keyed by article id (URL hash) and also matched by feed GUID, so
+an entry whose URL changes keeps its first-seen time and summary. Undated
+entries use their first-seen time as their date, so they count as new once
+instead of on every run.
+"""
+
+import logging
+import sqlite3
+from datetime import datetime, timezone, timedelta
+
+from pipeline.config import SEEN_INDEX_ENABLED, SEEN_INDEX_PATH, SEEN_INDEX_MAX_AGE_DAYS
+
+logger = logging.getLogger(__name__)
+
+_index: "SeenIndex | None" = None
+
+
+def guid_key(post: dict) -> str:
+    """Feed-scoped GUID of a post ("" if the feed gives none)."""
+    guid = post.get("guid") or ""
+    return f"{post.get('feed_url', '')}\0{guid}" if guid else ""
+
+
+class SeenIndex:
+    """article_id → first_seen, last_seen, guid key and the last summary produced for it."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " article_id TEXT PRIMARY KEY, guid_key TEXT, first_seen TEXT, last_seen TEXT,"
+            " summary_key TEXT, summary_version TEXT)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_guid ON entries (guid_key)")
+        self.conn.commit()
+
+    def _lookup(self, column: str, values: list[str]) -> dict[str, tuple]:
+        found = {}
+        unique = [v for v in dict.fromkeys(values) if v]
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT {column}, first_seen, summary_key, summary_version FROM entries"
+                f" WHERE {column} IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for value, *rest in rows:
+                found[value] = tuple(rest)
+        return found
+
+    def observe(self, entries: list[tuple[str, str]]) -> dict[str, dict]:
+        """Record sightings of (article_id, guid_key) pairs.
+
+        Returns:
+            {article_id: {"first_seen", "new", "summary_key", "summary_version"}}
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        by_id = self._lookup("article_id", [aid for aid, _ in entries])
+        by_guid = self._lookup("guid_key", [g for aid, g in entries if aid not in by_id])
+
+        sightings = {}
+        rows = []
+        for article_id, guid in entries:
+            if article_id in sightings:
+                continue
+            previous = by_id.get(article_id) or by_guid.get(guid)
+            first_seen, summary_key, summary_version = previous or (now, None, None)
+            sightings[article_id] = {
+                "first_seen": first_seen,
+                "new": previous is None,
+                "summary_key": summary_key,
+                "summary_version": summary_version,
+            }
+            rows.append((article_id, guid, first_seen, now, summary_key, summary_version))
+
+        self.conn.executemany(
+            "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (article_id) DO UPDATE SET"
+            " last_seen = excluded.last_seen,"
+            " guid_key = COALESCE(NULLIF(excluded.guid_key, ''), entries.guid_key)",
+            rows,
+        )
+        self.conn.commit()
+        new = sum(1 for s in sightings.values() if s["new"])
+        logger.info(f"Seen index: {new} new of {len(sightings)} entries")
+        return sightings
+
+    def set_summaries(self, items: list[tuple[str, str]], version: str):
+        """Remember the summary cache key last used for each (article_id, summary_key)."""
+        self.conn.executemany(
+            "UPDATE entries SET summary_key = ?, summary_version = ? WHERE article_id = ?",
+            [(key, version, article_id) for article_id, key in items],
+        )
+        self.conn.commit()
+
+    def prune(self, max_age_days: int):
+        """Forget entries that have not appeared in any feed for max_age_days."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=max_age_days)).isoformat()
+        removed = self.conn.execute("DELETE FROM entries WHERE last_seen < ?", (cutoff,)).rowcount
+        self.conn.commit()
+        if removed:
+            logger.info(f"Seen index pruned {removed} entries")
+
+    def close(self):
+        self.conn.close()
+
+
+def get_seen_index() -> SeenIndex | None:
+    """Return the run-wide seen-entry index, opening it on first use (None if disabled)."""
+    global _index
+    if _index is None and SEEN_INDEX_ENABLED:
+        try:
+            _index = SeenIndex(SEEN_INDEX_PATH)
+        except sqlite3.Error as e:
+            logger.warning(f"Seen index unavailable, continuing without it: {e}")
+            return None
+    return _index
+
+
+def close_seen_index():
+    """Prune and close the index at the end of a run."""
+    global _index
+    if _index is None:
+        return
+    _index.prune(SEEN_INDEX_MAX_AGE_DAYS)
+    _index.close()
+    _index = None
@@ -0,0 +1,125 @@
+"""Persistent AI summary cache (SQLite), so unchanged articles are never re-summarized."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+
+from pipeline.config import (
+    SUMMARY_CACHE_ENABLED, SUMMARY_CACHE_PATH,
+    SUMMARY_CACHE_MAX_AGE_DAYS, SUMMARY_CACHE_MAX_ROWS,
+)
+
+logger = logging.getLogger(__name__)
+
+_cache: "SummaryCache | None" = None
+
+
+def make_key(
+    kind: str, article_id: str, content: str, model: str,
+    prompt_version: str, variant: str = "",
+) -> str:
+    """Build a cache key from article id, content hash, model and prompt version.
+
+    Args:
+        kind: "short" (summary_zh + tags) or "long" (summary_long).
+        variant: extra prompt input that changes the output, e.g. a user's custom prompt.
+    """
+    content_hash = hashlib.sha256(content.encode()).hexdigest()
+    raw = "\0".join([kind, article_id, content_hash, model, prompt_version, variant])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SummaryCache:
+    """Key → JSON value store with last-used tracking for age/size eviction."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY, article_id TEXT, value TEXT,"
+            " created_at REAL, last_used REAL)"
+        )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        """Return {key: value} for the keys present in the cache."""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT key, value FROM summaries WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for key, value in rows:
+                found[key] = json.loads(value)
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE summaries SET last_used = ? WHERE key = ?",
+                [(now, k) for k in found],
+            )
+            self.conn.commit()
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+        return found
+
+    def get(self, key: str) -> dict | None:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: list[tuple[str, str, dict]]):
+        """Store (key, article_id, value) triples."""
+        if not items:
+            return
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+            [(k, aid, json.dumps(v, ensure_ascii=False), now, now) for k, aid, v in items],
+        )
+        self.conn.commit()
+
+    def put(self, key: str, article_id: str, value: dict):
+        self.put_many([(key, article_id, value)])
+
+    def evict(self, max_age_days: int, max_rows: int):
+        """Drop entries unused for max_age_days, then the least recently used beyond max_rows."""
+        cutoff = time.time() - max_age_days * 86400
+        aged = self.conn.execute("DELETE FROM summaries WHERE last_used < ?", (cutoff,)).rowcount
+        over = self.conn.execute(
+            "DELETE FROM summaries WHERE key IN ("
+            " SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (max_rows,),
+        ).rowcount
+        self.conn.commit()
+        if aged or over:
+            logger.info(f"Summary cache evicted {aged} stale and {over} overflow entries")
+
+    def close(self):
+        self.conn.close()
+
+
+def get_summary_cache() -> SummaryCache | None:
+    """Return the run-wide summary cache, opening it on first use (None if disabled)."""
+    global _cache
+    if _cache is None and SUMMARY_CACHE_ENABLED:
+        try:
+            _cache = SummaryCache(SUMMARY_CACHE_PATH)
+        except sqlite3.Error as e:
+            logger.warning(f"Summary cache unavailable, continuing without it: {e}")
+            return None
+    return _cache
+
+
+def close_summary_cache():
+    """Evict old entries and close the cache at the end of a run."""
+    global _cache
+    if _cache is None:
+        return
+    logger.info(f"Summary cache: {_cache.hits} hits, {_cache.misses} misses")
+    _cache.evict(SUMMARY_CACHE_MAX_AGE_DAYS, SUMMARY_CACHE_MAX_ROWS)
+    _cache.close()
+    _cache = None
@@ -0,0 +1,98 @@
+"""Precomputed tag facets: per-day and overall tag counts plus tag → article-id postings.
+
+Facet layout (site/content/tag-facets.json):
+  - dates:   {date: {counts, tree_counts, postings}}
+      counts       exact tag → article count
+      tree_counts  tag or any ancestor path → article count (hierarchical rollup)
+      postings     exact tag → article ids
+  - overall: {counts, tree} across all dates, counting each article once;
+             tree is nested [{tag, count, children}]
+"""
+
+import json
+import logging
+
+from pipeline.config import ARTICLES_DIR, TAG_FACETS_PATH
+
+logger = logging.getLogger(__name__)
+
+FACETS_VERSION = 1
+
+
+def _ancestors(tag: str) -> list[str]:
+    """Path prefixes of a tag: AI/LLM/Agent → AI, AI/LLM, AI/LLM/Agent."""
+    parts = tag.split("/")
+    return ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+def _day_facets(articles: list[dict]) -> dict:
+    postings: dict[str, list[str]] = {}
+    tree_ids: dict[str, set[str]] = {}
+    for article in articles:
+        for tag in dict.fromkeys(article.get("tags", [])):
+            postings.setdefault(tag, []).append(article["id"])
+            for prefix in _ancestors(tag):
+                tree_ids.setdefault(prefix, set()).add(article["id"])
+    return {
+        "counts": {tag: len(ids) for tag, ids in sorted(postings.items())},
+        "tree_counts": {tag: len(ids) for tag, ids in sorted(tree_ids.items())},
+        "postings": dict(sorted(postings.items())),
+    }
+
+
+def _overall(dates: dict[str, dict]) -> dict:
+    exact: dict[str, set[str]] = {}
+    rollup: dict[str, set[str]] = {}
+    for day in dates.values():
+        for tag, ids in day["postings"].items():
+            exact.setdefault(tag, set()).update(ids)
+            for prefix in _ancestors(tag):
+                rollup.setdefault(prefix, set()).update(ids)
+
+    def children(parent: str | None) -> list[dict]:
+        depth = 1 if parent is None else parent.count("/") + 2
+        nodes = []
+        for tag in sorted(rollup):
+            if tag.count("/") + 1 != depth:
+                continue
+            if parent is not None and not tag.startswith(parent + "/"):
+                continue
+            nodes.append({"tag": tag, "count": len(rollup[tag]), "children": children(tag)})
+        return nodes
+
+    return {
+        "counts": {tag: len(ids) for tag, ids in sorted(exact.items())},
+        "tree": children(None),
+    }
+
+
+def _load_dates() -> dict[str, dict]:
+    """Per-date facets from the existing file, or rebuilt from the whole archive."""
+    if TAG_FACETS_PATH.exists():
+        try:
+            data = json.loads(TAG_FACETS_PATH.read_text(encoding="utf-8"))
+            if data.get("version") == FACETS_VERSION:
+                return data["dates"]
+        except Exception as e:
+            logger.warning(f"Rebuilding unreadable tag facets: {e}")
+
+    dates = {}
+    for path in sorted(ARTICLES_DIR.glob("????-??-??.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        dates[path.stem] = _day_facets(data.get("articles", []))
+    logger.info(f"Built tag facets from archive: {len(dates)} dates")
+    return dates
+
+
+def build_tag_facets(articles_date: str, articles: list[dict]) -> dict:
+    """Replace `articles_date`'s facets and recompute the overall rollup.
+
+    Returns:
+        The facets data, ready to be written to TAG_FACETS_PATH.
+    """
+    dates = _load_dates()
+    dates[articles_date] = _day_facets(articles)
+    dates = dict(sorted(dates.items(), reverse=True))
+    overall = _overall(dates)
+    logger.info(f"Tag facets: {len(overall['counts'])} tags across {len(dates)} dates")
+    return {"version": FACETS_VERSION, "dates": dates, "overall": overall}
@@ -0,0 +1,58 @@
+"""Run-wide tag vocabulary: subtag usage counts that guide the AI toward tag reuse."""
+
+import json
+import logging
+from collections import Counter
+
+from pipeline.config import ARTICLES_DIR, AI_PROMPT_TAG_LIMIT
+
+logger = logging.getLogger(__name__)
+
+_vocabulary: "TagVocabulary | None" = None
+
+
+class TagVocabulary:
+    """Subtag → number of distinct articles using it."""
+
+    def __init__(self):
+        self.counts: Counter[str] = Counter()
+        self.seen: set[tuple[str, str]] = set()  # (article id, tag) already counted
+
+    def add(self, tags: list[str], article_id: str = ""):
+        """Count an article's subtags (top-level tags are always in the prompt)."""
+        for tag in tags:
+            if "/" not in tag:
+                continue
+            if article_id:
+                if (article_id, tag) in self.seen:
+                    continue
+                self.seen.add((article_id, tag))
+            self.counts[tag] += 1
+
+    def top(self, limit: int = AI_PROMPT_TAG_LIMIT) -> list[str]:
+        """Most used subtags, alphabetically ordered for a stable prompt."""
+        ranked = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+        return sorted(tag for tag, _ in ranked)
+
+
+def _load_archive(vocab: TagVocabulary):
+    """Count tags across every dated articles file in the archive."""
+    files = sorted(ARTICLES_DIR.glob("????-??-??.json"))
+    for path in files:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"Skipping unreadable {path.name} for tag vocabulary: {e}")
+            continue
+        for article in data.get("articles", []):
+            vocab.add(article.get("tags", []), article.get("id", ""))
+    logger.info(f"Tag vocabulary: {len(vocab.counts)} subtags from {len(files)} archive files")
+
+
+def get_tag_vocabulary() -> TagVocabulary:
+    """Return the run-wide vocabulary, building it from the archive on first use."""
+    global _vocabulary
+    if _vocabulary is None:
+        _vocabulary = TagVocabulary()
+        _load_archive(_vocabulary)
+    return _vocabulary
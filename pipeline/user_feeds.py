@@ -5,11 +5,25 @@ import hashlib
 import json
 import logging
 import os
+import time
 
 from pipeline.feed_fetcher import fetch_all_feeds
-from pipeline.ai_summarizer import _get_client, _batch_summarize, _validate_tag, SILICONFLOW_MODEL
-from pipeline.config import AI_BATCH_SIZE, FEEDS_OPML, SILICONFLOW_MODEL as MODEL
+from pipeline.ai_summarizer import (
+    _get_async_client, summarize_batches, pack_batches, _store_summaries, get_rate_limiter,
+    _validate_tag, _strip_code_fence, summary_cache_key, cached_tokens, SILICONFLOW_MODEL,
+)
+from pipeline.config import (
+    AI_LONG_BATCH_SIZE, AI_MAX_CONCURRENT_LONG,
+    FEEDS_OPML, SILICONFLOW_MODEL as MODEL,
+    USER_MAX_CONCURRENT, USER_MAX_CONCURRENT_PRO, USER_TIMEOUT,
+    SUPABASE_UPSERT_MAX_BYTES, SUPABASE_UPSERT_MAX_ROWS, SUPABASE_WRITE_CONCURRENCY,
+    USER_ROW_HASHES_PATH,
+)
+from pipeline.html_text import post_text
+from pipeline.metrics import get_run_metrics
 from pipeline.opml_parser import parse_opml
+from pipeline.rate_limit import estimate_tokens
+from pipeline.summary_cache import get_summary_cache, make_key
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +39,22 @@ LONG_SUMMARY_PROMPT = """请为以下文章写一篇深度中文摘要（300-500
 
 请直接输出摘要正文，不要加标题或前缀。"""
 
+LONG_BATCH_PROMPT = """请为以下 {count} 篇文章分别写一篇深度中文摘要（每篇300-500字），包含：
+1. 文章核心观点
+2. 关键论据或数据
+3. 对读者的实际价值
+
+{articles}
+
+请以JSON格式回复，不要包含其他内容，摘要正文不要加标题或前缀：
+{{"articles": [{{"index": 1, "summary_long": "..."}}]}}"""
+
+# Bump when LONG_SUMMARY_PROMPT / LONG_BATCH_PROMPT change, to invalidate cached long summaries
+LONG_PROMPT_VERSION = "3"
+LONG_MAX_TOKENS = 1500  # Per article
+
+_long_semaphore: asyncio.Semaphore | None = None
+
 
 def _get_supabase_client():
     """Create Supabase admin client using service role key."""
@@ -47,14 +77,63 @@ def _make_article_id(url: str) -> str:
     return hashlib.sha256(url.encode()).hexdigest()[:16]
 
 
+class _SharedResults:
+    """Run-wide memo of finished or in-flight results, so concurrent users share work.
+
+    A caller claims the keys nobody has started, computes them, and resolves
+    them; other callers await the same futures instead of recomputing.
+    """
+
+    def __init__(self):
+        self.futures: dict = {}
+
+    def claim(self, keys: list) -> list:
+        """Register keys not yet started and return the ones this caller must compute."""
+        loop = asyncio.get_running_loop()
+        mine = []
+        for key in dict.fromkeys(keys):
+            if key not in self.futures:
+                self.futures[key] = loop.create_future()
+                mine.append(key)
+        return mine
+
+    def resolve(self, key, value):
+        fut = self.futures.get(key)
+        if fut is not None and not fut.done():
+            fut.set_result(value)
+
+    def release(self, keys: list):
+        """Resolve claimed keys left unfinished with None and forget them, so later callers retry."""
+        for key in keys:
+            fut = self.futures.get(key)
+            if fut is not None and not fut.done():
+                fut.set_result(None)
+                del self.futures[key]
+
+    async def get(self, key):
+        # Shield so a waiter hitting its own timeout doesn't cancel the shared future
+        return await asyncio.shield(self.futures[key])
+
+
+def _normalize_feed_url(url: str) -> str:
+    return url.rstrip("/").lower()
+
+
 def _get_global_feed_urls() -> set[str]:
     """Get set of feed URLs from global OPML to deduplicate."""
     feeds = parse_opml(FEEDS_OPML)
-    return {f["xml_url"].rstrip("/").lower() for f in feeds}
+    return {_normalize_feed_url(f["xml_url"]) for f in feeds}
 
 
-async def process_user_feeds():
-    """Main entry: fetch user feeds from Supabase, process, write results back."""
+async def process_user_feeds(client=None):
+    """Main entry: fetch user feeds from Supabase, process, write results back.
+
+    Each distinct feed URL is fetched once for all subscribers, and each
+    article is summarized once per distinct custom prompt.
+
+    Args:
+        client: Shared httpx.AsyncClient from the global run, reused for user feeds.
+    """
     sb = _get_supabase_client()
     if sb is None:
         return
@@ -78,64 +157,189 @@ async def process_user_feeds():
             user_feeds[uid] = []
         user_feeds[uid].append(row)
 
-    logger.info(f"Processing feeds for {len(user_feeds)} users")
+    unique_feeds, plans = _plan_user_feeds(user_feeds, global_urls)
+    logger.info(
+        f"Processing feeds for {len(user_feeds)} users: "
+        f"{len(unique_feeds)} unique feeds to fetch"
+    )
+    if not unique_feeds:
+        return
+
+    metrics = get_run_metrics()
 
-    for user_id, feeds in user_feeds.items():
+    # Fetch every distinct feed once, then fan posts out by feed
+    posts_by_feed: dict[str, list[dict]] = {}
+    with metrics.stage("user_fetch"):
+        posts = await fetch_all_feeds(unique_feeds, client)
+    for post in posts:
+        posts_by_feed.setdefault(_normalize_feed_url(post["feed_url"]), []).append(post)
+
+    # Run-wide memos shared by all users: (custom prompt, article id) → article,
+    # article id → long summary
+    short_memo = _SharedResults()
+    long_memo = _SharedResults()
+    user_rows: dict[str, list[dict]] = {}
+
+    async def run_user(user_id: str, plan: dict):
         try:
-            await _process_user(sb, user_id, feeds, global_urls)
+            user_rows[user_id] = await asyncio.wait_for(
+                _process_user(user_id, plan, posts_by_feed, short_memo, long_memo),
+                timeout=USER_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"User {user_id[:8]}...: timed out after {USER_TIMEOUT}s")
         except Exception as e:
             logger.error(f"Failed processing user {user_id}: {e}")
 
+    with metrics.stage("user_summarize"):
+        await _schedule_users(plans, run_user)
+
+    # Single write phase for all users, in plan order so shared rows resolve deterministically
+    with metrics.stage("user_write"):
+        await _write_user_articles(sb, [row for uid in plans for row in user_rows.get(uid, [])])
+
+
+async def _schedule_users(plans: dict[str, dict], run_user):
+    """Run users concurrently under USER_MAX_CONCURRENT.
+
+    Free and pro users are interleaved in start order, and pro users (whose
+    long summaries take much longer) may hold at most USER_MAX_CONCURRENT_PRO
+    slots, so a wave of pro users can't starve free users or vice versa.
+    """
+    free = [uid for uid, plan in plans.items() if plan["tier"] != "pro"]
+    pro = [uid for uid, plan in plans.items() if plan["tier"] == "pro"]
+    order = []
+    for i in range(max(len(free), len(pro))):
+        order.extend(pro[i:i + 1] + free[i:i + 1])
+
+    slots = asyncio.Semaphore(max(1, USER_MAX_CONCURRENT))
+    pro_slots = asyncio.Semaphore(max(1, USER_MAX_CONCURRENT_PRO))
+
+    async def run(user_id: str):
+        plan = plans[user_id]
+        if plan["tier"] == "pro":
+            async with pro_slots, slots:
+                await run_user(user_id, plan)
+        else:
+            async with slots:
+                await run_user(user_id, plan)
+
+    await asyncio.gather(*[run(uid) for uid in order])
+
+
+def _plan_user_feeds(
+    user_feeds: dict[str, list[dict]], global_urls: set[str]
+) -> tuple[list[dict], dict[str, dict]]:
+    """Collect the union of non-global feeds across users.
+
+    Returns:
+        (unique_feeds, plans): feed dicts to fetch once, and per-user plans with
+        keys: feeds ({normalized url: feed title}), custom_prompt, tier.
+    """
+    unique_feeds: dict[str, dict] = {}
+    plans: dict[str, dict] = {}
+    for user_id, feeds in user_feeds.items():
+        # Get user's custom prompt and tier
+        custom_prompt = None
+        user_tier = "free"
+        if feeds and feeds[0].get("profiles"):
+            profile_data = feeds[0]["profiles"]
+            if isinstance(profile_data, dict):
+                custom_prompt = profile_data.get("custom_ai_prompt")
+                user_tier = profile_data.get("tier", "free")
+
+        # Separate: feeds already in global set vs unique user feeds
+        own_feeds = {}
+        for f in feeds:
+            normalized = _normalize_feed_url(f["feed_url"])
+            if normalized in global_urls:
+                continue
+            title = f.get("feed_title") or f["feed_url"]
+            own_feeds[normalized] = title
+            if normalized not in unique_feeds:
+                unique_feeds[normalized] = {
+                    "title": title,
+                    "xml_url": f["feed_url"],
+                    "html_url": "",
+                    "category": "user-custom",
+                }
+
+        if not own_feeds:
+            logger.info(f"User {user_id[:8]}...: all feeds overlap with global, skipping")
+            continue
+        plans[user_id] = {"feeds": own_feeds, "custom_prompt": custom_prompt, "tier": user_tier}
 
-async def _process_user(sb, user_id: str, feeds: list[dict], global_urls: set[str]):
-    """Process one user's custom feeds."""
-    # Separate: feeds already in global set vs unique user feeds
-    unique_feeds = []
-    for f in feeds:
-        normalized = f["feed_url"].rstrip("/").lower()
-        if normalized not in global_urls:
-            unique_feeds.append({
-                "title": f.get("feed_title") or f["feed_url"],
-                "xml_url": f["feed_url"],
-                "html_url": "",
-                "category": "user-custom",
-            })
+    return list(unique_feeds.values()), plans
 
-    if not unique_feeds:
-        logger.info(f"User {user_id[:8]}...: all feeds overlap with global, skipping")
-        return
 
-    logger.info(f"User {user_id[:8]}...: fetching {len(unique_feeds)} unique feeds")
+async def _process_user(
+    user_id: str,
+    plan: dict,
+    posts_by_feed: dict[str, list[dict]],
+    short_memo: _SharedResults,
+    long_memo: _SharedResults,
+):
+    """Summarize one user's posts, reusing work already done for other users.
+
+    Returns the user's user_articles rows; they are written later in one bulk phase.
+    """
+    timings: dict[str, float] = {}
+    started = time.monotonic()
 
-    # Fetch
-    posts = await fetch_all_feeds(unique_feeds)
+    posts = []
+    for normalized, title in plan["feeds"].items():
+        posts.extend({**p, "feed_title": title} for p in posts_by_feed.get(normalized, []))
     if not posts:
         logger.info(f"User {user_id[:8]}...: no posts fetched")
-        return
+        return []
 
     # Sort by published_at descending, limit to newest 50
     posts = sorted(posts, key=lambda p: p.get("published_at", ""), reverse=True)[:50]
+    custom_prompt = plan["custom_prompt"]
+    user_tier = plan["tier"]
 
-    # Get user's custom prompt and tier
-    custom_prompt = None
-    user_tier = "free"
-    if feeds and feeds[0].get("profiles"):
-        profile_data = feeds[0]["profiles"]
-        if isinstance(profile_data, dict):
-            custom_prompt = profile_data.get("custom_ai_prompt")
-            user_tier = profile_data.get("tier", "free")
+    # AI summarize (short summary for all users), once per prompt across users
+    prompt_key = custom_prompt or ""
+    keys = [(prompt_key, _make_article_id(p["url"])) for p in posts]
+    mine = short_memo.claim(keys)
+    try:
+        claimed = set(mine)
+        todo = list({k: p for k, p in zip(keys, posts) if k in claimed}.values())
+        for article in await _summarize_user_posts(todo, custom_prompt):
+            short_memo.resolve((prompt_key, article["id"]), article)
+    finally:
+        short_memo.release(mine)
 
-    # AI summarize (short summary for all users)
-    articles = _summarize_user_posts(posts, custom_prompt)
+    articles = []
+    for key, p in zip(keys, posts):
+        shared = await short_memo.get(key) if key in short_memo.futures else None
+        article = dict(shared) if shared else _fallback_article(p)
+        article["feed_title"] = p["feed_title"]
+        articles.append(article)
+    timings["summarize"] = time.monotonic() - started
 
     if not articles:
-        return
+        return []
 
-    # Pro users get long summaries too
+    # Pro users get long summaries too, shared across pro users
     if user_tier == "pro":
-        _generate_long_summaries(articles)
+        stage_start = time.monotonic()
+        ids = [a["id"] for a in articles]
+        mine = long_memo.claim(ids)
+        try:
+            claimed = set(mine)
+            todo = [a for a in articles if a["id"] in claimed]
+            await _generate_long_summaries(todo)
+            for a in todo:
+                if a.get("summary_long"):
+                    long_memo.resolve(a["id"], a["summary_long"])
+        finally:
+            long_memo.release(mine)
+        for a in articles:
+            if not a.get("summary_long") and a["id"] in long_memo.futures:
+                a["summary_long"] = await long_memo.get(a["id"])
+        timings["long"] = time.monotonic() - stage_start
 
-    # Write to Supabase
     rows = []
     for a in articles:
         rows.append({
@@ -151,86 +355,287 @@ async def _process_user(sb, user_id: str, feeds: list[dict], global_urls: set[st
             "published_at": a.get("published_at") or None,
         })
 
-    sb.table("user_articles").upsert(rows, on_conflict="id").execute()
-    logger.info(f"User {user_id[:8]}...: wrote {len(rows)} articles (tier={user_tier})")
-
+    get_run_metrics().record_user(user_id, len(rows), timings)
+    stages = ", ".join(f"{name} {secs:.1f}s" for name, secs in timings.items())
+    logger.info(
+        f"User {user_id[:8]}...: prepared {len(rows)} articles (tier={user_tier}) "
+        f"in {time.monotonic() - started:.1f}s [{stages}]"
+    )
+    return rows
+
+
+async def _write_user_articles(sb, rows: list[dict]):
+    """Upsert all users' rows in size-bounded chunks, concurrently and off the event loop.
+
+    Rows whose content hash matches the last successful write are skipped.
+    user_articles is keyed by article id alone, so when several users share an
+    article the last row wins, as with the old per-user upserts.
+    """
+    started = time.monotonic()
+    by_id = {row["id"]: row for row in rows}
+    previous = _load_row_hashes()
+    hashes = {row_id: _row_hash(row) for row_id, row in by_id.items()}
+    changed = [row for row_id, row in by_id.items() if previous.get(row_id) != hashes[row_id]]
+    if not changed:
+        logger.info(f"User articles: all {len(by_id)} rows unchanged, nothing to write")
+        _save_row_hashes(hashes)
+        return
 
-def _summarize_user_posts(posts: list[dict], custom_prompt: str | None = None) -> list[dict]:
+    chunks = _chunk_rows(changed)
+    semaphore = asyncio.Semaphore(max(1, SUPABASE_WRITE_CONCURRENCY))
+
+    async def write(chunk: list[dict]) -> bool:
+        async with semaphore:
+            try:
+                await asyncio.to_thread(
+                    lambda: sb.table("user_articles").upsert(chunk, on_conflict="id").execute()
+                )
+                return True
+            except Exception as e:
+                logger.error(f"User articles upsert of {len(chunk)} rows failed: {e}")
+                return False
+
+    results = await asyncio.gather(*[write(c) for c in chunks])
+
+    # Only remember hashes for rows that were actually written (or already up to date)
+    failed_ids = {row["id"] for chunk, ok in zip(chunks, results) if not ok for row in chunk}
+    for row_id in failed_ids:
+        hashes.pop(row_id, None)
+    _save_row_hashes(hashes)
+    logger.info(
+        f"User articles: wrote {len(changed) - len(failed_ids)}/{len(changed)} changed rows "
+        f"in {len(chunks)} chunks, skipped {len(by_id) - len(changed)} unchanged "
+        f"({time.monotonic() - started:.1f}s)"
+    )
+
+
+def _chunk_rows(rows: list[dict]) -> list[list[dict]]:
+    """Split rows into chunks bounded by serialized size and row count."""
+    chunks: list[list[dict]] = []
+    current: list[dict] = []
+    current_bytes = 0
+    for row in rows:
+        size = len(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+        if current and (
+            current_bytes + size > SUPABASE_UPSERT_MAX_BYTES
+            or len(current) >= SUPABASE_UPSERT_MAX_ROWS
+        ):
+            chunks.append(current)
+            current, current_bytes = [], 0
+        current.append(row)
+        current_bytes += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _row_hash(row: dict) -> str:
+    return hashlib.sha256(json.dumps(row, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+def _load_row_hashes() -> dict[str, str]:
+    if not USER_ROW_HASHES_PATH.exists():
+        return {}
+    try:
+        return json.loads(USER_ROW_HASHES_PATH.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable {USER_ROW_HASHES_PATH.name}: {e}")
+        return {}
+
+
+def _save_row_hashes(hashes: dict[str, str]):
+    """Persist hashes of this run's rows (older rows drop out naturally)."""
+    tmp = USER_ROW_HASHES_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(hashes), encoding="utf-8")
+    tmp.replace(USER_ROW_HASHES_PATH)
+
+
+def _fallback_article(post: dict) -> dict:
+    """Article without an AI summary: title as summary, generic tag.
+
+    Carries the post's plain text so long summaries don't re-derive it from the HTML.
+    """
+    return {
+        "id": _make_article_id(post["url"]),
+        "title": post["title"],
+        "url": post["url"],
+        "feed_title": post.get("feed_title", ""),
+        "published_at": post.get("published_at", ""),
+        "content": post.get("content", ""),
+        "text": post_text(post),
+        "summary_zh": post["title"],
+        "tags": ["tools"],
+    }
+
+
+async def _summarize_user_posts(posts: list[dict], custom_prompt: str | None = None) -> list[dict]:
     """Summarize posts for a user, optionally using their custom prompt."""
+    if not posts:
+        return []
     try:
-        client = _get_client()
+        client = _get_async_client()
     except RuntimeError:
         logger.warning("AI API not configured, skipping summarization")
         # Return articles without AI summary
-        return [
-            {
-                "id": _make_article_id(p["url"]),
-                "title": p["title"],
-                "url": p["url"],
-                "feed_title": p.get("feed_title", ""),
-                "published_at": p.get("published_at", ""),
-                "content": p.get("content", ""),
-                "summary_zh": p["title"],
-                "tags": ["tools"],
-            }
-            for p in posts
-        ]
+        return [_fallback_article(p) for p in posts]
+
+    # Only cache misses go to the API; hits may come from other users or the global run
+    cache = get_summary_cache()
+    keys = [summary_cache_key(p, custom_prompt) for p in posts]
+    known = cache.get_many(keys) if cache else {}
+    misses = [(k, p) for k, p in zip(keys, posts) if k not in known]
+
+    batches = pack_batches(misses)
+    await summarize_batches(
+        client,
+        [[p for _, p in b] for b in batches],
+        custom_prompt,
+        on_result=lambda i, result: _store_summaries(batches[i], result[0], known, cache),
+    )
 
     articles = []
-    for i in range(0, len(posts), AI_BATCH_SIZE):
-        batch = posts[i : i + AI_BATCH_SIZE]
-        summaries, _tokens = _batch_summarize(client, batch, custom_prompt)
-
-        for j, post in enumerate(batch):
-            idx = j + 1
-            summary_data = summaries.get(idx)
-            if summary_data:
-                summary_zh = summary_data.get("summary_zh", post["title"])
-                tags = [t for t in summary_data.get("tags", []) if _validate_tag(t)]
-            else:
-                summary_zh = post["title"]
-                tags = ["tools"]
-
-            articles.append({
-                "id": _make_article_id(post["url"]),
-                "title": post["title"],
-                "url": post["url"],
-                "feed_title": post.get("feed_title", ""),
-                "published_at": post.get("published_at", ""),
-                "content": post.get("content", ""),
-                "summary_zh": summary_zh,
-                "tags": tags if tags else ["tools"],
-            })
+    for key, post in zip(keys, posts):
+        summary_data = known.get(key)
+        if not summary_data:
+            articles.append(_fallback_article(post))
+            continue
+
+        tags = [t for t in summary_data.get("tags", []) if _validate_tag(t)]
+        articles.append({
+            **_fallback_article(post),
+            "summary_zh": summary_data.get("summary_zh", post["title"]),
+            "tags": tags if tags else ["tools"],
+        })
 
     return articles
 
 
-def _generate_long_summaries(articles: list[dict]):
-    """Generate long-form summaries for pro users. Modifies articles in-place."""
+def _long_summary_key(article: dict) -> str:
+    """Summary cache key for an article's long summary (shared by all pro users).
+
+    The feed title is left out: it is the subscriber's own label and differs between users.
+    """
+    return make_key(
+        "long", article["id"],
+        f"{article['title']}\n{post_text(article)[:4000]}",
+        MODEL, LONG_PROMPT_VERSION,
+    )
+
+
+async def _generate_long_summaries(articles: list[dict]):
+    """Generate long-form summaries for pro users. Modifies articles in-place.
+
+    Cache misses are packed AI_LONG_BATCH_SIZE articles per request and sent
+    concurrently (AI_MAX_CONCURRENT_LONG) under the run-wide token limiter.
+    Articles missing from a batched reply are retried one by one.
+    """
+    cache = get_summary_cache()
+    pending = [a for a in articles if post_text(a)[:4000]]
+    keys = [_long_summary_key(a) for a in pending]
+    known = cache.get_many(keys) if cache else {}
+    misses = []
+    for key, article in zip(keys, pending):
+        if key in known:
+            article["summary_long"] = known[key]["summary_long"]
+        else:
+            misses.append((key, article))
+    if not misses:
+        return
+
     try:
-        client = _get_client()
+        client = _get_async_client()
     except RuntimeError:
         logger.warning("AI API not configured, skipping long summaries")
         return
-
-    for article in articles:
-        content = (article.get("content") or "")[:4000]
-        if not content:
-            continue
-
+    semaphore = _get_long_semaphore()
+
+    async def run(batch: list[tuple[str, dict]]):
+        async with semaphore:
+            results = await _long_summary_request(client, [a for _, a in batch])
+        if len(batch) > 1:
+            # Retry anything the batched reply dropped on its own
+            retry = [i for i in range(len(batch)) if not results.get(i + 1)]
+            for i in retry:
+                async with semaphore:
+                    single = await _long_summary_request(client, [batch[i][1]])
+                if single.get(1):
+                    results[i + 1] = single[1]
+
+        fresh = []
+        for j, (key, article) in enumerate(batch):
+            summary_long = results.get(j + 1)
+            if summary_long:
+                article["summary_long"] = summary_long
+                fresh.append((key, article["id"], {"summary_long": summary_long}))
+        if cache:
+            cache.put_many(fresh)
+
+    size = max(1, AI_LONG_BATCH_SIZE)
+    await asyncio.gather(*[run(misses[i:i + size]) for i in range(0, len(misses), size)])
+
+
+def _get_long_semaphore() -> asyncio.Semaphore:
+    """Run-wide cap on in-flight long-summary requests across all pro users."""
+    global _long_semaphore
+    if _long_semaphore is None:
+        _long_semaphore = asyncio.Semaphore(max(1, AI_MAX_CONCURRENT_LONG))
+    return _long_semaphore
+
+
+async def _long_summary_request(client, batch: list[dict]) -> dict[int, str]:
+    """Request long summaries for one or more articles. Returns {1-based index: summary}."""
+    if len(batch) == 1:
+        article = batch[0]
         prompt = LONG_SUMMARY_PROMPT.format(
             title=article["title"],
             feed_title=article.get("feed_title", ""),
-            content=content,
+            content=post_text(article)[:4000],
         )
-
-        try:
-            response = client.chat.completions.create(
-                model=MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=1500,
+    else:
+        article_text = ""
+        for i, article in enumerate(batch):
+            article_text += (
+                f"\n---\n文章 {i+1}:\n"
+                f"文章标题: {article['title']}\n"
+                f"来源: {article.get('feed_title', '')}\n"
+                f"内容:\n{post_text(article)[:4000]}\n"
             )
-            article["summary_long"] = response.choices[0].message.content.strip()
-        except Exception as e:
-            logger.warning(f"Long summary failed for {article['id']}: {e}")
+        prompt = LONG_BATCH_PROMPT.format(count=len(batch), articles=article_text)
+
+    limiter = get_rate_limiter()
+    max_tokens = LONG_MAX_TOKENS * len(batch)
+    reserved = estimate_tokens(prompt) + max_tokens
+    await limiter.acquire(reserved)
+    tokens = 0
+    cached = 0
+    started = time.monotonic()
+    ok = False
+    try:
+        response = await client.chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=max_tokens,
+        )
+        tokens = response.usage.total_tokens if response.usage else 0
+        cached = cached_tokens(response.usage)
+        content = response.choices[0].message.content.strip()
+        if len(batch) == 1:
+            ok = True
+            return {1: content}
+
+        results = {}
+        for item in json.loads(_strip_code_fence(content)).get("articles", []):
+            idx = item.get("index")
+            if idx is not None and item.get("summary_long"):
+                results[idx] = item["summary_long"].strip()
+        ok = True
+        return results
+    except Exception as e:
+        logger.warning(f"Long summary failed for {', '.join(a['id'] for a in batch)}: {e}")
+        return {}
+    finally:
+        limiter.settle(reserved, tokens)
+        get_run_metrics().record_llm_call(
+            "long", len(batch), time.monotonic() - started, tokens, ok, cached_tokens=cached,
+        )
@@ -1,7 +1,7 @@
 import { NextRequest, NextResponse } from "next/server";
 import { readdirSync } from "fs";
 import { join } from "path";
-import { getArticlesByDate } from "@/lib/content";
+import { getArticlesByDate, getSearchIndex, tokenize, SearchIndex } from "@/lib/content";
 
 const ARTICLES_DIR = join(process.cwd(), "content", "articles");
 const MAX_RESULTS = 50;
@@ -18,6 +18,13 @@ export async function GET(request: NextRequest) {
 
   const query = q.trim().toLowerCase();
 
+  // Answer from the prebuilt index when the pipeline has written one
+  const index = getSearchIndex();
+  if (index) {
+    const results = searchIndex(index, query);
+    return NextResponse.json({ results, query: q, count: results.length });
+  }
+
   // Get all date files
   let dateFiles: string[];
   try {
@@ -72,3 +79,53 @@ export async function GET(request: NextRequest) {
 
   return NextResponse.json({ results, query: q, count: results.length });
 }
+
+// Doc numbers matching one query token. ASCII tokens match as prefixes and a
+// single CJK character matches any term containing it, approximating the
+// substring search used without an index.
+function matchToken(index: SearchIndex, token: string): Set<number> {
+  const ascii = /^[a-z0-9]/.test(token);
+  if (!ascii && token.length > 1) return new Set(index.postings[token] ?? []);
+
+  const matched = new Set<number>();
+  for (const [term, docs] of Object.entries(index.postings)) {
+    if (ascii ? term.startsWith(token) : term.includes(token)) {
+      for (const n of docs) matched.add(n);
+    }
+  }
+  return matched;
+}
+
+function searchIndex(index: SearchIndex, query: string) {
+  const tokens = [...new Set(tokenize(query))];
+
+  let docNumbers: number[];
+  if (tokens.length === 0) {
+    // Nothing indexable (e.g. punctuation only): substring scan over indexed docs
+    docNumbers = index.docs
+      .map((doc, n) => ({ doc, n }))
+      .filter(({ doc }) =>
+        [doc.title, doc.summary_zh, doc.feed_title, doc.author, ...doc.tags]
+          .some((field) => field.toLowerCase().includes(query))
+      )
+      .map(({ n }) => n);
+  } else {
+    // AND across tokens; start from the rarest to keep intersections small
+    const sets = tokens.map((t) => matchToken(index, t)).sort((a, b) => a.size - b.size);
+    docNumbers = [...sets[0]].filter((n) => sets.every((s) => s.has(n)));
+    docNumbers.sort((a, b) => a - b); // docs are stored newest first
+  }
+
+  return docNumbers.slice(0, MAX_RESULTS).map((n) => {
+    const doc = index.docs[n];
+    return {
+      id: doc.id,
+      title: doc.title,
+      url: doc.url,
+      feed_title: doc.feed_title,
+      summary_zh: doc.summary_zh,
+      tags: doc.tags,
+      date: doc.date,
+    };
+  });
+}
@@ -1,5 +1,5 @@
 import { NextResponse } from "next/server";
-import { getLatestArticles } from "@/lib/content";
+import { getLatestArticles, getTagFacets } from "@/lib/content";
 
 export async function GET() {
   const data = getLatestArticles();
@@ -7,10 +7,14 @@ export async function GET() {
     return NextResponse.json({ tags: [] });
   }
 
-  const counts: Record<string, number> = {};
-  for (const article of data.articles) {
-    for (const tag of article.tags) {
-      counts[tag] = (counts[tag] || 0) + 1;
+  // Precomputed by the pipeline; fall back to counting the day's articles
+  let counts = getTagFacets()?.dates[data.date]?.counts;
+  if (!counts) {
+    counts = {};
+    for (const article of data.articles) {
+      for (const tag of article.tags) {
+        counts[tag] = (counts[tag] || 0) + 1;
+      }
     }
   }
 
@@ -11,6 +11,7 @@ interface Article {
   feed_title: string;
   summary_zh: string;
   tags: string[];
+  alternates?: { title: string; url: string; feed_title: string }[];
 }
 
 interface ArticleCardProps {
@@ -179,6 +180,19 @@ export function ArticleCard({
         <a href={article.url} target="_blank" rel="noopener noreferrer" className="text-xs text-gray-500 hover:text-gray-700">
           原文链接 ↗
         </a>
+        {article.alternates && article.alternates.length > 0 && (
+          <span className="text-xs text-gray-400 truncate">
+            另见：
+            {article.alternates.map((alt, i) => (
+              <span key={alt.url}>
+                {i > 0 && " · "}
+                <a href={alt.url} target="_blank" rel="noopener noreferrer" className="hover:text-gray-600">
+                  {alt.feed_title || alt.title}
+                </a>
+              </span>
+            ))}
+          </span>
+        )}
       </div>
     </article>
   );
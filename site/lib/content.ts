@@ -1,9 +1,11 @@
-import { readFileSync, existsSync } from "fs";
+import { readFileSync, existsSync, statSync, openSync, readSync, closeSync } from "fs";
 import { join } from "path";
+import { gunzipSync } from "zlib";
 
 const CONTENT_DIR = join(process.cwd(), "content");
 const ARTICLES_DIR = join(CONTENT_DIR, "articles");
 const ARTICLE_CONTENT_DIR = join(CONTENT_DIR, "article-content");
+const ARTICLE_BUNDLE_DIR = join(CONTENT_DIR, "article-bundles");
 
 export interface Article {
   id: string;
@@ -15,9 +17,16 @@ export interface Article {
   published_at: string;
   summary_zh: string;
   tags: string[];
+  alternates?: ArticleSource[]; // Same story from other feeds (pipeline/dedup.py)
   // Note: content field is no longer included in list responses
 }
 
+export interface ArticleSource {
+  title: string;
+  url: string;
+  feed_title: string;
+}
+
 export interface ArticleContent {
   id: string;
   title: string;
@@ -64,6 +73,20 @@ export function getArticlesByDate(date: string): ArticlesData | null {
 
 export function getArticlesByTags(data: ArticlesData, tags: string[]): Article[] {
   const queryTags = tags.map((t) => t.toLowerCase());
+
+  // Precomputed postings for this date: union the ids of matching tags
+  const day = getTagFacets()?.dates[data.date];
+  if (day) {
+    const ids = new Set<string>();
+    for (const [tag, articleIds] of Object.entries(day.postings)) {
+      const lower = tag.toLowerCase();
+      if (queryTags.some((q) => lower === q || lower.startsWith(q + "/"))) {
+        articleIds.forEach((id) => ids.add(id));
+      }
+    }
+    return data.articles.filter((a) => ids.has(a.id));
+  }
+
   return data.articles.filter((a) =>
     a.tags.some((articleTag) => {
       const lower = articleTag.toLowerCase();
@@ -86,7 +109,105 @@ export function getFeedsData(): FeedsData | null {
   return readJson<FeedsData>(join(CONTENT_DIR, "feeds.json"));
 }
 
+// Parsed JSON kept in memory until the file changes on disk
+const jsonCache = new Map<string, { mtimeMs: number; data: unknown }>();
+
+function readJsonCached<T>(path: string): T | null {
+  if (!existsSync(path)) return null;
+  const { mtimeMs } = statSync(path);
+  const cached = jsonCache.get(path);
+  if (cached && cached.mtimeMs === mtimeMs) return cached.data as T;
+  const data = readJson<T>(path);
+  jsonCache.set(path, { mtimeMs, data });
+  return data;
+}
+
+// id → [shard, offset, length, content_hash], written by pipeline/content_bundles.py
+type BundleIndex = Record<string, [string, number, number, string]>;
+
+function getBundleIndex(): BundleIndex | null {
+  return readJsonCached<BundleIndex>(join(ARTICLE_BUNDLE_DIR, "index.json"));
+}
+
+function readBundledContent(id: string): ArticleContent | null {
+  const entry = getBundleIndex()?.[id];
+  if (!entry) return null;
+  const [shard, offset, length] = entry;
+  const buf = Buffer.alloc(length);
+  const fd = openSync(join(ARTICLE_BUNDLE_DIR, `${shard}.bin`), "r");
+  try {
+    readSync(fd, buf, 0, length, offset);
+  } finally {
+    closeSync(fd);
+  }
+  return JSON.parse(gunzipSync(buf).toString("utf-8")) as ArticleContent;
+}
+
 export function getArticleContent(id: string): ArticleContent | null {
   if (!/^[a-f0-9]+$/i.test(id)) return null;
-  return readJson<ArticleContent>(join(ARTICLE_CONTENT_DIR, `${id}.json`));
+  return (
+    readBundledContent(id) ??
+    readJson<ArticleContent>(join(ARTICLE_CONTENT_DIR, `${id}.json`))
+  );
+}
+
+export interface SearchDoc {
+  id: string;
+  date: string;
+  title: string;
+  url: string;
+  feed_title: string;
+  author: string;
+  summary_zh: string;
+  tags: string[];
+}
+
+export interface SearchIndex {
+  version: number;
+  docs: SearchDoc[]; // newest date first
+  postings: Record<string, number[]>; // term → doc numbers, ascending
+}
+
+// Written by pipeline/search_index.py
+export function getSearchIndex(): SearchIndex | null {
+  return readJsonCached<SearchIndex>(join(CONTENT_DIR, "search-index.json"));
+}
+
+// Must match pipeline/search_index.py tokenize(): ASCII words + CJK bigrams
+export function tokenize(text: string): string[] {
+  const tokens: string[] = [];
+  const runs = text.toLowerCase().match(/[a-z0-9]+|[\u3400-\u9fff\uf900-\ufaff]+/g) ?? [];
+  for (const run of runs) {
+    if (/^[a-z0-9]/.test(run)) {
+      if (run.length >= 2) tokens.push(run);
+    } else if (run.length === 1) {
+      tokens.push(run);
+    } else {
+      for (let i = 0; i < run.length - 1; i++) tokens.push(run.slice(i, i + 2));
+    }
+  }
+  return tokens;
+}
+
+export interface TagFacetNode {
+  tag: string;
+  count: number;
+  children: TagFacetNode[];
+}
+
+export interface DayTagFacets {
+  counts: Record<string, number>; // exact tag → article count
+  tree_counts: Record<string, number>; // tag incl. descendants → article count
+  postings: Record<string, string[]>; // exact tag → article ids
+}
+
+export interface TagFacets {
+  version: number;
+  dates: Record<string, DayTagFacets>;
+  overall: { counts: Record<string, number>; tree: TagFacetNode[] };
+}
+
+// Written by pipeline/tag_facets.py
+export function getTagFacets(): TagFacets | null {
+  return readJsonCached<TagFacets>(join(CONTENT_DIR, "tag-facets.json"));
 }
@@ -0,0 +1,29 @@
+from pipeline.html_text import count_words, html_to_text, post_text
+
+
+def test_blocks_become_lines_and_markup_is_dropped():
+    html = (
+        "<div><h2>Title &amp; more</h2><p>Hello   <b>world</b></p>"
+        "<script>var x = 1;</script><ul><li>one</li><li>two</li></ul></div>"
+    )
+    assert html_to_text(html) == "Title & more\nHello world\none\ntwo"
+
+
+def test_boilerplate_lines_are_removed():
+    html = "<p>Body text.</p><p>The post Foo appeared first on Bar.</p><p>阅读全文</p>"
+    assert html_to_text(html) == "Body text."
+
+
+def test_literal_less_than_is_kept():
+    assert html_to_text("if a < b and c > d") == "if a < b and c > d"
+    assert html_to_text("<p>if a < b and c > d</p>") == "if a < b and c > d"
+    assert html_to_text("<p>x &lt;b&gt; y</p>") == "x <b> y"
+
+
+def test_count_words_counts_cjk_characters():
+    assert count_words("Hello world 中文内容") == 6
+
+
+def test_post_text_falls_back_to_content():
+    assert post_text({"text": "plain"}) == "plain"
+    assert post_text({"content": "<p>from html</p>"}) == "from html"